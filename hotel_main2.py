@@ -1,25 +1,338 @@
 import pandas as pd
 import json
+import io
+import time
+import hashlib
+import gzip
+import inspect
+import tempfile
+import glob
+import shutil
+from urllib.parse import quote, unquote
+import threading
+import collections
+import asyncio
+import atexit
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import psycopg2
-from psycopg2 import OperationalError
+from psycopg2 import OperationalError, sql, extensions
+from psycopg2.pool import ThreadedConnectionPool
 import os
 from abc import ABC, abstractmethod
 import sys
+import argparse
+import functools
+import cProfile
+import tracemalloc
 from datetime import datetime
 
+try:
+    import resource
+except ImportError:
+    # No disponible en Windows
+    resource = None
+
+def read_json_state(path):
+    """Lee un archivo JSON de estado/caché; devuelve {} si no existe"""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def write_json_state(path, state):
+    """Escribe un archivo JSON de estado/caché creando su directorio
+
+    Se escribe en un temporal y se reemplaza, para que otro hilo o proceso
+    nunca lea un archivo a medio escribir.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(state, file, indent=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def is_text_dtype(dtype):
+    """True para columnas de texto: object o category (tras DtypeOptimizer)"""
+    return dtype == 'object' or isinstance(dtype, pd.CategoricalDtype)
+
+def map_categories(series, func):
+    """Aplica func a las etiquetas de una columna category, no a cada fila
+
+    Si varias etiquetas quedan iguales (p. ej. 'prt' y 'PRT' al pasar a
+    mayúsculas) se fusionan en una sola categoría.
+    """
+    new_labels = func(pd.Series(series.cat.categories, dtype='object'))
+    label_codes, categories = pd.factorize(new_labels)
+    codes = series.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, label_codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=categories), index=series.index, name=series.name)
+
+class DtypeOptimizer:
+    """Reduce la memoria de un DataFrame antes de la limpieza
+
+    - Texto con pocos valores distintos (country, customer_type, hotel,
+      meal, market_segment, arrival_date_month...) -> category.
+    - Enteros (adults, children, babies...) -> el entero más pequeño posible.
+    - Flotantes -> float32 solo si downcast_floats=True, porque cambia
+      ligeramente los valores (y con ello las medianas).
+    """
+    def __init__(self, max_unique_ratio=0.5, downcast_floats=False):
+        self.max_unique_ratio = max_unique_ratio
+        self.downcast_floats = downcast_floats
+
+    def optimize(self, data):
+        if data is None:
+            return None
+
+        memory_before = data.memory_usage(deep=True).sum()
+        optimized = {}
+        for col in data.columns:
+            series = data[col]
+            if series.dtype == 'object':
+                if series.nunique(dropna=True) <= self.max_unique_ratio * len(series):
+                    series = series.astype('category')
+            elif pd.api.types.is_integer_dtype(series.dtype):
+                series = pd.to_numeric(series, downcast='integer')
+            elif pd.api.types.is_float_dtype(series.dtype) and self.downcast_floats:
+                series = pd.to_numeric(series, downcast='float')
+            optimized[col] = series
+
+        result = pd.DataFrame(optimized, index=data.index)
+        memory_after = result.memory_usage(deep=True).sum()
+        print(f"Memoria: {memory_before / 1e6:.1f} MB -> {memory_after / 1e6:.1f} MB")
+        return result
+
+def concat_batches(batches):
+    """Une lotes de un lector por bloques sin que un lote decida mal los tipos
+
+    Una columna casi vacía (p. ej. company) puede ser toda nula en un lote;
+    se quita de ese lote antes de unir, así el tipo lo deciden los lotes
+    con valores y no pasa a object. Se conserva el orden de las columnas.
+    """
+    if not batches:
+        return pd.DataFrame()
+    columns = list(dict.fromkeys(col for batch in batches for col in batch.columns))
+    has_values = [batch.notna().any() for batch in batches]
+    filled = set().union(*(set(present.index[present]) for present in has_values))
+    frames = [batch.drop(columns=[col for col in batch.columns if col in filled and not present[col]])
+              for batch, present in zip(batches, has_values)]
+    data = pd.concat(frames, ignore_index=True)
+    return data if list(data.columns) == columns else data[columns]
+
+def file_sha256(path, length=None):
+    """SHA-256 del archivo (o de sus primeros length bytes), leído por bloques"""
+    digest = hashlib.sha256()
+    remaining = length
+    with open(path, 'rb') as file:
+        while remaining is None or remaining > 0:
+            block = file.read(1 << 20 if remaining is None else min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso en MB (None si no se puede medir)"""
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def current_rss_mb():
+    """Memoria residente actual del proceso en MB (None si no se puede medir)"""
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+class PipelineHook(ABC):
+    """Interfaz de hooks de instrumentación: recibe un dict por evento"""
+    @abstractmethod
+    def emit(self, event):
+        pass
+
+    def close(self):
+        pass
+
+class JSONLinesHook(PipelineHook):
+    """Escribe cada evento como una línea JSON en un archivo"""
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def emit(self, event):
+        self.file.write(json.dumps(event, default=str) + '\n')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class Instrumentation:
+    """Registro de hooks y captura opcional de perfiles por etapa
+
+    Sin hooks registrados ni etapas a perfilar, las funciones decoradas con
+    @instrumented solo hacen dos comprobaciones baratas antes de ejecutarse.
+    profile_stages activa cProfile y tracemalloc para esas etapas
+    (p. ej. 'DataCleaner._convert_dates'); el perfil se guarda en
+    profile_dir y el pico de tracemalloc se añade al evento.
+    La memoria de cada evento es la RSS al terminar la etapa y su variación
+    (rss_delta_mb); el pico del proceso solo crece y no distingue etapas.
+    """
+    def __init__(self):
+        self.hooks = []
+        self.profile_stages = set()
+        self.profile_dir = None
+        self._profiling = False
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+        hook.close()
+
+    def enable_profiling(self, stages, profile_dir=None):
+        self.profile_stages = set(stages)
+        self.profile_dir = profile_dir or os.path.join(salidan, 'profiles')
+
+    def emit(self, event):
+        for hook in self.hooks:
+            hook.emit(event)
+
+    @staticmethod
+    def _frame(result, args):
+        """DataFrame asociado a la llamada: resultado, argumento o self.data"""
+        if isinstance(result, pd.DataFrame):
+            return result
+        for arg in args:
+            if isinstance(arg, pd.DataFrame):
+                return arg
+            if isinstance(getattr(arg, 'data', None), pd.DataFrame):
+                return arg.data
+        return None
+
+    def call(self, kind, stage, func, args, kwargs):
+        """Ejecuta func midiendo tiempo, filas, bytes y memoria"""
+        profiler = None
+        if stage in self.profile_stages and not self._profiling:
+            self._profiling = True
+            profiler = cProfile.Profile()
+            tracemalloc.start()
+            profiler.enable()
+
+        event = {'timestamp': datetime.now().isoformat(), 'kind': kind, 'stage': stage}
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception as e:
+            event['error'] = str(e)
+            raise
+        finally:
+            event['wall_s'] = round(time.perf_counter() - start, 6)
+
+            if profiler is not None:
+                profiler.disable()
+                event['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+                tracemalloc.stop()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profile_path = os.path.join(self.profile_dir, f"{stage}_{datetime.now():%Y%m%d_%H%M%S_%f}.prof")
+                profiler.dump_stats(profile_path)
+                event['profile_path'] = profile_path
+                self._profiling = False
+
+            frame = self._frame(result, args)
+            if frame is not None:
+                event['rows'] = len(frame)
+                event['bytes'] = int(frame.memory_usage(deep=False).sum())
+            file_path = getattr(args[0], 'file_path', None) if args else None
+            if isinstance(file_path, str) and os.path.isfile(file_path):
+                event['file_bytes'] = os.path.getsize(file_path)
+            rss_after = current_rss_mb()
+            if rss_after is not None:
+                event['rss_mb'] = round(rss_after, 1)
+                event['rss_delta_mb'] = round(rss_after - rss_before, 1)
+            self.emit(event)
+
+# Instancia global usada por @instrumented
+instrumentation = Instrumentation()
+
+def instrumented(kind):
+    """Decorador: emite un evento por llamada si hay hooks o la etapa se perfila"""
+    def decorator(func):
+        stage = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.hooks and stage not in instrumentation.profile_stages:
+                return func(*args, **kwargs)
+            return instrumentation.call(kind, stage, func, args, kwargs)
+        return wrapper
+    return decorator
+
 class DataLoader(ABC):
     """Clase abstracta para cargar datos desde diferentes fuentes"""
     @abstractmethod
     def load_data(self):
         pass
 
+    def load_optimized(self, optimizer=None):
+        """Carga los datos y aplica DtypeOptimizer antes de la limpieza"""
+        return (optimizer or DtypeOptimizer()).optimize(self.load_data())
+
+    def schema_columns(self):
+        """Columnas que produce la fuente sin cargarla (None si no se sabe barato)
+
+        Los loaders que además aceptan un atributo columns permiten que
+        LazyPipeline limite la lectura a las columnas necesarias.
+        """
+        return None
+
 class CSVDataLoader(DataLoader):
-    """Cargador de datos desde archivos CSV"""
-    def __init__(self, file_path):
+    """Cargador de datos desde archivos CSV
+
+    columns limita la lectura a esas columnas (las que no existan se ignoran).
+    """
+    def __init__(self, file_path, columns=None):
         self.file_path = file_path
+        self.columns = columns
+
+    def schema_columns(self):
+        return list(pd.read_csv(self.file_path, nrows=0).columns)
 
+    @instrumented('load')
     def load_data(self):
         try:
+            if self.columns is not None:
+                selected = set(self.columns)
+                return pd.read_csv(self.file_path, usecols=lambda col: col in selected)
             return pd.read_csv(self.file_path)
         except FileNotFoundError:
             print(f"Error: No se encontró el archivo {self.file_path}")
@@ -28,14 +341,172 @@ class CSVDataLoader(DataLoader):
             print(f"Error al cargar CSV: {str(e)}")
             return None
 
+    def iter_chunks(self, chunksize=100_000, dtype=None):
+        """Lee el CSV en bloques de tamaño fijo (generador de DataFrames)"""
+        return pd.read_csv(self.file_path, chunksize=chunksize, dtype=dtype)
+
+class ExcelEngine:
+    """Lectura y escritura de Excel por streaming, con caché columnar
+
+    - Lectura con openpyxl en modo read_only, por lotes de batch_size filas.
+    - Escritura en memoria constante: xlsxwriter (constant_memory) si está
+      instalado, si no openpyxl en modo write_only.
+    - Caché: tras la primera lectura se guarda junto al libro un archivo
+      Arrow (<libro>.cache.arrow) y sus metadatos (tamaño, mtime y SHA-256).
+      Si el libro no cambió, las siguientes lecturas salen de la caché sin
+      volver a interpretar el XML.
+    """
+    # Cadenas que pd.read_excel interpreta como nulos
+    NA_STRINGS = {'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+                  '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'}
+
+    def __init__(self, batch_size=10_000, use_cache=True):
+        self.batch_size = batch_size
+        self.use_cache = use_cache
+
+    def iter_batches(self, file_path, sheet_name=None):
+        """Genera DataFrames de hasta batch_size filas leyendo en modo read_only"""
+        if file_path.lower().endswith('.xls'):
+            # openpyxl no lee el formato antiguo .xls: pandas (con xlrd) sí
+            data = pd.read_excel(file_path, sheet_name=sheet_name or 0)
+            for start in range(0, len(data), self.batch_size):
+                yield data.iloc[start:start + self.batch_size]
+            return
+
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [str(name) if name is not None else f'Unnamed: {i}' for i, name in enumerate(header)]
+
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    yield self._to_frame(batch, header)
+                    batch = []
+            if batch:
+                yield self._to_frame(batch, header)
+        finally:
+            workbook.close()
+
+    def _to_frame(self, rows, header):
+        """Construye un lote con las mismas reglas de tipos que pd.read_excel"""
+        columns = {}
+        for i, name in enumerate(header):
+            values = []
+            for row in rows:
+                value = row[i] if i < len(row) else None
+                if isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                elif isinstance(value, str) and value in self.NA_STRINGS:
+                    value = None
+                values.append(value)
+            columns[name] = values
+        return pd.DataFrame(columns).infer_objects()
+
+    def _cache_paths(self, file_path):
+        return file_path + '.cache.arrow', file_path + '.cache.json'
+
+    def _cached(self, file_path):
+        """DataFrame desde la caché si el libro no cambió; None en otro caso"""
+        data_path, meta_path = self._cache_paths(file_path)
+        meta = read_json_state(meta_path)
+        if not meta or not os.path.exists(data_path):
+            return None
+
+        stat = os.stat(file_path)
+        if meta.get('size') != stat.st_size:
+            return None
+        if meta.get('mtime') != stat.st_mtime:
+            # mtime distinto (p. ej. copiado o tocado): comprobar el contenido
+            if meta.get('sha256') != file_sha256(file_path):
+                return None
+            meta['mtime'] = stat.st_mtime
+            write_json_state(meta_path, meta)
+        return pd.read_feather(data_path)
+
+    def _store_cache(self, file_path, data):
+        data_path, meta_path = self._cache_paths(file_path)
+        try:
+            data.to_feather(data_path, compression='uncompressed')
+            stat = os.stat(file_path)
+            write_json_state(meta_path, {'size': stat.st_size, 'mtime': stat.st_mtime,
+                                         'sha256': file_sha256(file_path)})
+        except Exception as e:
+            # La caché es opcional (requiere pyarrow); la lectura ya terminó bien
+            print(f"Aviso: no se pudo guardar la caché de Excel: {str(e)}")
+
+    def read(self, file_path, sheet_name=None):
+        """Lee el libro completo (desde la caché si es posible)"""
+        if self.use_cache and sheet_name is None:
+            try:
+                data = self._cached(file_path)
+                if data is not None:
+                    return data
+            except Exception as e:
+                print(f"Aviso: caché de Excel no válida, se vuelve a leer el libro: {str(e)}")
+
+        data = concat_batches(list(self.iter_batches(file_path, sheet_name)))
+
+        if self.use_cache and sheet_name is None:
+            self._store_cache(file_path, data)
+        return data
+
+    def write(self, data, file_path):
+        """Escribe el DataFrame fila a fila con memoria constante"""
+        try:
+            import xlsxwriter
+        except ImportError:
+            xlsxwriter = None
+
+        if xlsxwriter is not None:
+            workbook = xlsxwriter.Workbook(file_path, {'constant_memory': True, 'nan_inf_to_errors': True})
+            sheet = workbook.add_worksheet('Sheet1')
+            datetime_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+            sheet.write_row(0, 0, [str(col) for col in data.columns])
+            row_number = 1
+            for rows in self._iter_rows(data):
+                for row in rows:
+                    for col_number, value in enumerate(row):
+                        if isinstance(value, datetime):
+                            sheet.write_datetime(row_number, col_number, value, datetime_format)
+                        elif value is not None:
+                            sheet.write(row_number, col_number, value)
+                    row_number += 1
+            workbook.close()
+        else:
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet('Sheet1')
+            sheet.append([str(col) for col in data.columns])
+            for rows in self._iter_rows(data):
+                for row in rows:
+                    sheet.append(row)
+            workbook.save(file_path)
+
+    def _iter_rows(self, data):
+        """Filas como listas de valores Python (None para nulos), por lotes"""
+        for start in range(0, len(data), self.batch_size):
+            chunk = data.iloc[start:start + self.batch_size].astype(object)
+            yield chunk.where(chunk.notna(), None).values.tolist()
+
 class ExcelDataLoader(DataLoader):
-    """Cargador de datos desde archivos Excel"""
-    def __init__(self, file_path):
+    """Cargador de datos desde archivos Excel (ver ExcelEngine)"""
+    def __init__(self, file_path, use_cache=True):
         self.file_path = file_path
+        self.engine = ExcelEngine(use_cache=use_cache)
 
+    @instrumented('load')
     def load_data(self):
         try:
-            return pd.read_excel(self.file_path)
+            return self.engine.read(self.file_path)
         except FileNotFoundError:
             print(f"Error: No se encontró el archivo {self.file_path}")
             return None
@@ -44,15 +515,105 @@ class ExcelDataLoader(DataLoader):
             return None
 
 class JSONDataLoader(DataLoader):
-    """Cargador de datos desde archivos JSON"""
-    def __init__(self, file_path):
+    """Cargador de datos desde archivos JSON
+
+    Lee de forma incremental tanto un arreglo JSON de registros como JSON
+    delimitado por líneas (NDJSON), también comprimidos con gzip (.gz).
+    Los registros se acumulan por columnas en lotes de batch_size filas,
+    así que nunca se tiene en memoria la lista completa de diccionarios.
+    Un objeto orientado a columnas ({"col": [...]} o {"col": {fila: valor}},
+    como DataFrame.to_json() por defecto) se lee completo con pandas.
+    """
+    READ_SIZE = 1 << 20
+
+    def __init__(self, file_path, batch_size=50_000):
         self.file_path = file_path
+        self.batch_size = batch_size
+
+    def _open(self):
+        if self.file_path.endswith('.gz'):
+            return gzip.open(self.file_path, 'rt', encoding='utf-8')
+        return open(self.file_path, 'r', encoding='utf-8')
+
+    def iter_records(self):
+        """Genera los registros uno a uno sin cargar todo el archivo"""
+        decoder = json.JSONDecoder()
+        with self._open() as file:
+            buffer = file.read(self.READ_SIZE)
+            position = 0
+            eof = not buffer
+
+            # Un arreglo empieza con '['; NDJSON empieza directamente con '{'
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            is_array = position < len(buffer) and buffer[position] == '['
+            if is_array:
+                position += 1
+            first = True
+
+            while True:
+                # Saltar separadores entre registros
+                while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ','):
+                    position += 1
+                if position < len(buffer) and buffer[position] == ']':
+                    return
+
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # Registro incompleto: leer más del archivo
+                    if eof:
+                        if buffer[position:].strip():
+                            raise
+                        return
+                    more = file.read(self.READ_SIZE)
+                    eof = not more
+                    buffer = buffer[position:] + more
+                    position = 0
+                    continue
+
+                if first and not is_array and self._is_columnar(record):
+                    # Objeto orientado a columnas: cada valor es una columna completa
+                    yield from pd.DataFrame(record).to_dict('records')
+                    return
+                first = False
+                yield record
+                position = end
 
+    @staticmethod
+    def _is_columnar(record):
+        """True si el objeto es un DataFrame por columnas y no un registro"""
+        return (isinstance(record, dict) and bool(record)
+                and all(isinstance(value, (list, dict)) for value in record.values()))
+
+    def iter_batches(self):
+        """Genera DataFrames de hasta batch_size filas construidos por columnas"""
+        columns = {}
+        rows = 0
+        for record in self.iter_records():
+            for key, value in record.items():
+                if key not in columns:
+                    # Columna nueva en este lote: rellenar las filas anteriores
+                    columns[key] = [None] * rows
+                columns[key].append(value)
+            rows += 1
+            if len(record) != len(columns):
+                for values in columns.values():
+                    if len(values) < rows:
+                        values.append(None)
+
+            if rows >= self.batch_size:
+                yield pd.DataFrame(columns)
+                columns = {}
+                rows = 0
+
+        if rows:
+            yield pd.DataFrame(columns)
+
+    @instrumented('load')
     def load_data(self):
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-            return pd.DataFrame(data)
+            return concat_batches(list(self.iter_batches()))
         except FileNotFoundError:
             print(f"Error: No se encontró el archivo {self.file_path}")
             return None
@@ -60,27 +621,273 @@ class JSONDataLoader(DataLoader):
             print(f"Error al cargar JSON: {str(e)}")
             return None
 
+class ParquetDataLoader(DataLoader):
+    """Cargador de datos desde archivos Parquet (requiere pyarrow)
+
+    columns limita la lectura a esas columnas y filters (formato de
+    pyarrow, p. ej. [('hotel', '=', 'Resort Hotel')]) descarta los
+    row groups que no cumplen el predicado sin leerlos.
+    """
+    def __init__(self, file_path, columns=None, filters=None):
+        self.file_path = file_path
+        self.columns = columns
+        self.filters = filters
+
+    def schema_columns(self):
+        import pyarrow.parquet as pq
+        return [name for name in pq.read_schema(self.file_path).names if not name.startswith('__index_level_')]
+
+    @instrumented('load')
+    def load_data(self):
+        try:
+            return pd.read_parquet(self.file_path, engine='pyarrow', columns=self.columns, filters=self.filters)
+        except FileNotFoundError:
+            print(f"Error: No se encontró el archivo {self.file_path}")
+            return None
+        except Exception as e:
+            print(f"Error al cargar Parquet: {str(e)}")
+            return None
+
+class ArrowDataLoader(DataLoader):
+    """Cargador de datos desde archivos Arrow IPC/Feather (requiere pyarrow)
+
+    El archivo se abre con memory map; load_table devuelve la tabla de
+    Arrow sin copiar los datos y load_data la convierte a DataFrame.
+    """
+    def __init__(self, file_path, columns=None):
+        self.file_path = file_path
+        self.columns = columns
+
+    def schema_columns(self):
+        import pyarrow as pa
+        with pa.memory_map(self.file_path) as source:
+            return pa.ipc.open_file(source).schema.names
+
+    def load_table(self):
+        """Tabla de pyarrow respaldada por el archivo mapeado en memoria"""
+        import pyarrow.feather as feather
+        return feather.read_table(self.file_path, columns=self.columns, memory_map=True)
+
+    @instrumented('load')
+    def load_data(self):
+        try:
+            return self.load_table().to_pandas()
+        except FileNotFoundError:
+            print(f"Error: No se encontró el archivo {self.file_path}")
+            return None
+        except Exception as e:
+            print(f"Error al cargar Arrow: {str(e)}")
+            return None
+
+def loader_for_path(file_path):
+    """DataLoader adecuado según la extensión del archivo"""
+    name = file_path.lower()
+    if name.endswith(('.csv', '.csv.gz', '.txt')):
+        return CSVDataLoader(file_path)
+    if name.endswith(('.xlsx', '.xlsm', '.xls')):
+        return ExcelDataLoader(file_path)
+    if name.endswith(('.json', '.ndjson', '.jsonl', '.json.gz', '.ndjson.gz', '.jsonl.gz')):
+        return JSONDataLoader(file_path)
+    if name.endswith('.parquet'):
+        return ParquetDataLoader(file_path)
+    if name.endswith(('.arrow', '.feather')):
+        return ArrowDataLoader(file_path)
+    return None
+
+def _load_file(file_path):
+    """Tarea de hilo/proceso: carga un archivo con su loader"""
+    return loader_for_path(file_path).load_data()
+
+class MultiFileDataLoader(DataLoader):
+    """Carga en paralelo varios archivos a partir de un patrón glob o una carpeta
+
+    Los archivos (p. ej. hotel_bookings_YYYYMMDD.csv) se leen con un
+    ThreadPoolExecutor (o ProcessPoolExecutor con use_processes=True).
+    iter_parts entrega cada parte en cuanto termina; load_data une todas
+    en el orden de los nombres de archivo, alineando las columnas (las que
+    faltan en una parte quedan nulas).
+    """
+    def __init__(self, pattern, max_workers=None, use_processes=False):
+        self.pattern = pattern
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+
+    def files(self):
+        """Archivos soportados que coinciden con el patrón, ordenados por nombre"""
+        if os.path.isdir(self.pattern):
+            candidates = glob.glob(os.path.join(self.pattern, '*'))
+        else:
+            candidates = glob.glob(self.pattern, recursive=True)
+        return sorted(path for path in candidates if os.path.isfile(path) and loader_for_path(path) is not None)
+
+    def iter_parts(self):
+        """Genera (ruta, DataFrame) en el orden en que terminan de cargarse"""
+        files = self.files()
+        if not files:
+            return
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(_load_file, path): path for path in files}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    @staticmethod
+    def combine(parts, files):
+        """Une las partes en el orden de files con la unión de columnas"""
+        frames = [parts[path] for path in files if parts.get(path) is not None]
+        if not frames:
+            return None
+
+        columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+        # Solo se reindexan las partes a las que les faltan columnas
+        frames = [frame if list(frame.columns) == columns else frame.reindex(columns=columns) for frame in frames]
+        return pd.concat(frames, ignore_index=True, copy=False)
+
+    @instrumented('load')
+    def load_data(self):
+        try:
+            files = self.files()
+            if not files:
+                print(f"Error: No se encontraron archivos para {self.pattern}")
+                return None
+            parts = dict(self.iter_parts())
+            print(f"{len(files)} archivos cargados desde {self.pattern}")
+            return self.combine(parts, files)
+        except Exception as e:
+            print(f"Error al cargar varios archivos: {str(e)}")
+            return None
+
+    def load_and_clean(self, source_path=None):
+        """Carga y limpia, convirtiendo fechas de cada parte mientras llegan las demás
+
+        _convert_dates trabaja fila a fila, así que se aplica a cada parte al
+        terminar su carga; los pasos con estadísticas globales (medianas de
+        _handle_nulls) se ejecutan una vez sobre el conjunto unido, por lo que
+        el resultado es el mismo que limpiar load_data().
+        """
+        try:
+            files = self.files()
+            parts = {}
+            for path, part in self.iter_parts():
+                if part is not None:
+                    cleaner = DataCleaner(part, source_path=path)
+                    cleaner._convert_dates()
+                    part = cleaner.data
+                parts[path] = part
+
+            data = self.combine(parts, files)
+            if data is None:
+                print(f"Error: No se encontraron datos para {self.pattern}")
+                return None
+
+            cleaner = DataCleaner(data, source_path=source_path)
+            cleaner._handle_nulls()
+            cleaner._create_new_columns()
+            cleaner._standardize_formats()
+            return cleaner.data
+        except Exception as e:
+            print(f"Error durante la carga y limpieza de varios archivos: {str(e)}")
+            return None
+
+class PostgresConnectionPool:
+    """Pools de conexiones compartidos, uno por configuración de conexión
+
+    connection(db_config) presta una conexión dentro de un bloque with y la
+    devuelve al pool al salir (con rollback si quedó una transacción
+    abierta; se descarta si la conexión se rompió). Si todas están en uso,
+    se espera a que se libere una en lugar de fallar.
+    """
+    def __init__(self, minconn=1, maxconn=None):
+        self.minconn = minconn
+        self.maxconn = maxconn or max(4, os.cpu_count() or 1)
+        self._pools = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(db_config):
+        return tuple(sorted((key, str(value)) for key, value in db_config.items()))
+
+    def _get_pool(self, db_config):
+        key = self._key(db_config)
+        with self._lock:
+            if key not in self._pools:
+                pool = ThreadedConnectionPool(self.minconn, self.maxconn, **db_config)
+                # Abre minconn conexiones al inicio, pero conserva abiertas hasta
+                # maxconn al devolverlas (por defecto psycopg2 cierra las que
+                # pasan de minconn y cada préstamo volvería a conectar)
+                pool.minconn = self.maxconn
+                self._pools[key] = pool
+                self._slots[key] = threading.BoundedSemaphore(self.maxconn)
+            return self._pools[key], self._slots[key]
+
+    @contextlib.contextmanager
+    def connection(self, db_config):
+        pool, slots = self._get_pool(db_config)
+        slots.acquire()
+        connection = None
+        broken = False
+        try:
+            connection = pool.getconn()
+            yield connection
+        except (OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            if connection is not None:
+                broken = broken or connection.closed != 0
+                if not broken and connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                pool.putconn(connection, close=broken)
+            slots.release()
+
+    def close_all(self):
+        """Cierra todas las conexiones de todos los pools"""
+        with self._lock:
+            for pool in self._pools.values():
+                pool.closeall()
+            self._pools.clear()
+            self._slots.clear()
+
+postgres_pool = PostgresConnectionPool()
+atexit.register(postgres_pool.close_all)
+
 class PostgreSQLDataLoader(DataLoader):
-    """Cargador de datos desde PostgreSQL"""
-    def __init__(self, dbname, user, password, host, port, table_name):
+    """Cargador de datos desde PostgreSQL
+
+    method='copy' usa COPY ... TO STDOUT hacia un buffer en memoria;
+    method='cursor' usa un cursor con nombre (del lado del servidor) y
+    lee por lotes de batch_size filas. Las conexiones salen de postgres_pool.
+    date_range=(columna, inicio, fin) limita la lectura a inicio <= columna < fin.
+    """
+    def __init__(self, dbname, user, password, host, port, table_name, method='copy', batch_size=50_000,
+                 date_range=None):
         self.dbname = dbname
         self.user = user
         self.password = password
         self.host = host
         self.port = port
         self.table_name = table_name
+        self.method = method
+        self.batch_size = batch_size
+        self.date_range = date_range
+
+    def db_config(self):
+        return {'dbname': self.dbname, 'user': self.user, 'password': self.password,
+                'host': self.host, 'port': self.port}
 
+    @instrumented('load')
     def load_data(self):
         try:
-            connection = psycopg2.connect(
-                dbname=self.dbname,
-                user=self.user,
-                password=self.password,
-                host=self.host,
-                port=self.port
-            )
-            query = f"SELECT * FROM {self.table_name}"
-            return pd.read_sql(query, connection)
+            with postgres_pool.connection(self.db_config()) as connection:
+                start = time.perf_counter()
+                if self.method == 'cursor':
+                    data = self._load_cursor(connection)
+                else:
+                    data = self._load_copy(connection)
+            elapsed = time.perf_counter() - start
+            print(f"{len(data)} filas leídas de {self.table_name} ({len(data) / max(elapsed, 1e-9):,.0f} filas/s)")
+            return data
         except OperationalError as e:
             print(f"Error de conexión a PostgreSQL: {str(e)}")
             return None
@@ -88,13 +895,319 @@ class PostgreSQLDataLoader(DataLoader):
             print(f"Error al cargar desde PostgreSQL: {str(e)}")
             return None
 
+    def _table_identifier(self):
+        """Identificador seguro para 'tabla' o 'esquema.tabla'"""
+        return sql.Identifier(*self.table_name.split('.'))
+
+    def _select_query(self):
+        """SELECT de la tabla, filtrado por date_range si se indicó"""
+        query = sql.SQL("SELECT * FROM {}").format(self._table_identifier())
+        if self.date_range is None:
+            return query
+        column, start, end = self.date_range
+        return sql.SQL("{} WHERE {col} >= {} AND {col} < {}").format(
+            query, sql.Literal(str(start)), sql.Literal(str(end)), col=sql.Identifier(column))
+
+    def _load_copy(self, connection):
+        """Lee la tabla completa con COPY TO STDOUT en formato CSV"""
+        with connection.cursor() as cursor:
+            # Columnas de fecha para volver a convertirlas al leer el CSV
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = %s AND data_type IN ('date', 'timestamp without time zone', 'timestamp with time zone')",
+                (self.table_name.split('.')[-1],)
+            )
+            date_columns = [row[0] for row in cursor.fetchall()]
+
+            buffer = io.StringIO()
+            source = self._table_identifier() if self.date_range is None else sql.SQL("({})").format(self._select_query())
+            query = sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER true)").format(source)
+            cursor.copy_expert(query, buffer)
+
+        buffer.seek(0)
+        return pd.read_csv(buffer, parse_dates=date_columns)
+
+    def _load_cursor(self, connection):
+        """Lee la tabla con un cursor del lado del servidor en lotes"""
+        frames = []
+        with connection.cursor(name='etl_bulk_reader') as cursor:
+            cursor.itersize = self.batch_size
+            cursor.execute(self._select_query())
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                columns = [desc[0] for desc in cursor.description]
+                frames.append(pd.DataFrame.from_records(rows, columns=columns))
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+class AsyncPostgreSQLLoader:
+    """Lectura concurrente de varias tablas o particiones por fecha con asyncio
+
+    Cada lectura es un PostgreSQLDataLoader ejecutado con asyncio.to_thread
+    (psycopg2 libera el GIL mientras espera al servidor) y usa una conexión
+    de postgres_pool; max_concurrency limita las lecturas simultáneas.
+    """
+    def __init__(self, db_config, method='copy', max_concurrency=4):
+        self.db_config = db_config
+        self.method = method
+        self.max_concurrency = max_concurrency
+
+    async def _load(self, semaphore, table_name, date_range=None):
+        async with semaphore:
+            loader = PostgreSQLDataLoader(table_name=table_name, method=self.method,
+                                          date_range=date_range, **self.db_config)
+            return await asyncio.to_thread(loader.load_data)
+
+    async def load_tables(self, table_names):
+        """Devuelve {tabla: DataFrame} (None en las tablas que fallaron)"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        frames = await asyncio.gather(*(self._load(semaphore, name) for name in table_names))
+        return dict(zip(table_names, frames))
+
+    async def load_partitions(self, table_name, date_column, ranges):
+        """Lee cada rango [inicio, fin) de date_column en paralelo y los une en orden"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        frames = await asyncio.gather(*(
+            self._load(semaphore, table_name, (date_column, start, end)) for start, end in ranges
+        ))
+        if any(frame is None for frame in frames):
+            print(f"Error: no se pudieron leer todas las particiones de {table_name}")
+            return None
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def month_ranges(start, end):
+        """Rangos mensuales [inicio, fin) que cubren de start a end"""
+        bounds = pd.date_range(pd.Timestamp(start).to_period('M').to_timestamp(),
+                               pd.Timestamp(end).to_period('M').to_timestamp() + pd.offsets.MonthBegin(1),
+                               freq='MS')
+        return [(bounds[i].date(), bounds[i + 1].date()) for i in range(len(bounds) - 1)]
+
+
+
+class DateParser:
+    """Conversión rápida de columnas de fecha con inferencia de formato
+
+    Equivale a pd.to_datetime(format='mixed', dayfirst=True), pero:
+    - Cada cadena distinta se convierte una sola vez y el resultado se
+      reparte a todas las filas (las fechas de reservas se repiten mucho).
+    - Con una muestra se infieren uno o pocos formatos explícitos; solo se
+      aceptan formatos que dan el mismo resultado que el parser mixto.
+    - Las cadenas que no encajan en ningún formato usan el parser mixto.
+    - Si se indica source_path, los formatos inferidos se guardan en un
+      archivo JSON por archivo de origen y las siguientes ejecuciones
+      omiten la inferencia.
+    """
+    # Formatos candidatos (día antes que mes, igual que dayfirst=True)
+    CANDIDATE_FORMATS = [
+        '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%Y/%m/%d', '%d.%m.%Y',
+        '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%d/%m/%y'
+    ]
+    SAMPLE_SIZE = 1000
+
+    def __init__(self, source_path=None, cache_path=None):
+        self.source_key = os.path.abspath(source_path) if source_path else None
+        self.cache_path = cache_path or os.path.join(salidan, 'date_formats_cache.json')
+
+    def parse(self, series, column):
+        """Devuelve la serie convertida a datetime64"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Convertir solo las etiquetas y repartirlas con los códigos
+            parsed = self.parse(pd.Series(series.cat.categories, dtype='object'), column)
+            values = pd.api.extensions.take(parsed.array, series.cat.codes.to_numpy(), allow_fill=True)
+            return pd.Series(values, index=series.index, name=series.name)
+        if series.dtype != 'object':
+            return pd.to_datetime(series, errors='coerce', format='mixed', dayfirst=True)
+
+        # Convertir solo los valores únicos
+        codes, uniques = pd.factorize(series)
+        uniques = pd.Series(uniques, dtype='object')
+
+        formats = self._cached_formats(column)
+        if formats is None:
+            formats = self.infer_formats(uniques)
+            self._store_formats(column, formats)
+
+        parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+        for fmt in formats:
+            pending = parsed.isna()
+            if not pending.any():
+                break
+            parsed[pending] = pd.to_datetime(uniques[pending], format=fmt, errors='coerce')
+
+        # Respaldo: las cadenas que no encajan con los formatos inferidos
+        pending = parsed.isna()
+        if pending.any():
+            parsed[pending] = pd.to_datetime(uniques[pending], errors='coerce', format='mixed', dayfirst=True)
+
+        # Repartir el resultado de cada valor único a sus filas (-1 = nulo)
+        values = pd.api.extensions.take(parsed.array, codes, allow_fill=True)
+        return pd.Series(values, index=series.index, name=series.name)
+
+    def infer_formats(self, uniques):
+        """Formatos explícitos que reproducen al parser mixto en una muestra"""
+        sample = uniques.sample(min(len(uniques), self.SAMPLE_SIZE), random_state=0) if len(uniques) else uniques
+        reference = pd.to_datetime(sample, errors='coerce', format='mixed', dayfirst=True)
+
+        formats = []
+        pending = reference.notna()
+        for fmt in self.CANDIDATE_FORMATS:
+            if not pending.any():
+                break
+            candidate = pd.to_datetime(sample, format=fmt, errors='coerce')
+            matched = candidate.notna()
+            # Un formato que discrepa del parser mixto en algún valor se descarta
+            if not matched.any() or (candidate[matched] != reference[matched]).any():
+                continue
+            if (matched & pending).any():
+                formats.append(fmt)
+                pending &= ~matched
+        return formats
+
+    def _cached_formats(self, column):
+        if self.source_key is None:
+            return None
+        return read_json_state(self.cache_path).get(self.source_key, {}).get(column)
+
+    def _store_formats(self, column, formats):
+        if self.source_key is None:
+            return
+        try:
+            cache = read_json_state(self.cache_path)
+            cache.setdefault(self.source_key, {})[column] = formats
+            write_json_state(self.cache_path, cache)
+        except OSError as e:
+            # La caché es opcional; un fallo al escribirla no detiene la limpieza
+            print(f"Aviso: no se pudo guardar la caché de formatos de fecha: {str(e)}")
+
+
+
+class DerivedColumnEngine:
+    """Columnas derivadas a partir de una especificación declarativa (SPEC)
+
+    Tipos de columna:
+    - 'date': fecha desde año/mes (nombre)/día con aritmética entera de
+      datetime64 (sin concatenar cadenas); fechas imposibles -> NaT.
+    - 'sum': suma vectorizada de las columnas de requires.
+    - 'lookup': tabla de consulta indexada por número de mes -> category.
+    - 'bins': intervalos (a, b] con searchsorted -> category ordenada
+      (igual que pd.cut con bins y labels).
+    Los nombres de mes se resuelven una vez por valor distinto (factorize)
+    contra la tabla MONTHS; los valores desconocidos dan nulo.
+    """
+    MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+              'August', 'September', 'October', 'November', 'December']
+    MONTH_INDEX = pd.Index(MONTHS, dtype=object)
+    # Tablas indexadas por número de mes (posición 0 = mes desconocido)
+    LOOKUP_TABLES = {
+        'season': (['Baja', 'Media', 'Alta'], np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, 1, 1, 1, 2], dtype=np.int8))
+    }
+    SPEC = [
+        {'name': 'arrival_date', 'kind': 'date',
+         'requires': ['arrival_date_year', 'arrival_date_month', 'arrival_date_day_of_month']},
+        # Duración de la estancia en noches
+        {'name': 'stay_duration', 'kind': 'sum', 'requires': ['stays_in_weekend_nights', 'stays_in_week_nights']},
+        # Total de personas (adultos + niños + bebés)
+        {'name': 'total_guests', 'kind': 'sum', 'requires': ['adults', 'children', 'babies']},
+        # Temporada (alta/media/baja) basada en el mes de llegada
+        {'name': 'season', 'kind': 'lookup', 'table': 'season', 'requires': ['arrival_date_month']},
+        # Categoría de precio por tarifa diaria (las de cortesía, adr 0, son Económico)
+        {'name': 'price_category', 'kind': 'bins', 'requires': ['adr'],
+         'bins': [float('-inf'), 100, 200, float('inf')], 'labels': ['Económico', 'Estándar', 'Premium']}
+    ]
+
+    def __init__(self, spec=None):
+        self.spec = spec or self.SPEC
+
+    @classmethod
+    def month_number(cls, series):
+        """Número de mes (1-12) de cada fila; 0 si el nombre no es un mes"""
+        codes, uniques = pd.factorize(series)
+        lookup = cls.MONTH_INDEX.get_indexer(np.asarray(uniques, dtype=object)) + 1
+        # El código -1 (nulo) toma el último elemento: 0
+        return np.append(lookup, 0).astype(np.int8)[codes]
+
+    def _date(self, frame, year_column, month_column, day_column):
+        year = pd.to_numeric(frame[year_column], errors='coerce').to_numpy(dtype='float64')
+        day = pd.to_numeric(frame[day_column], errors='coerce').to_numpy(dtype='float64')
+        month = self.month_number(frame[month_column]).astype(np.int64)
+        valid = ~np.isnan(year) & ~np.isnan(day) & (month > 0) & (day >= 1) & (day <= 31)
+
+        months = ((np.where(valid, year, 1970).astype(np.int64) - 1970) * 12 + np.where(valid, month, 1) - 1)
+        months = months.astype('datetime64[M]')
+        dates = months.astype('datetime64[D]') + (np.where(valid, day, 1).astype(np.int64) - 1)
+        # Un día fuera del mes (p. ej. 31 de abril) pasaría al mes siguiente
+        valid &= dates.astype('datetime64[M]') == months
+        return pd.Series(np.where(valid, dates, np.datetime64('NaT')).astype('datetime64[ns]'), index=frame.index)
 
+    @staticmethod
+    def _sum(frame, columns):
+        def widen(series):
+            # Igual que sum(axis=1): enteros pequeños se suman como int64
+            if pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+                return series.astype('int64')
+            return series.astype('float64')
+        return functools.reduce(lambda total, col: total + widen(frame[col]), columns[1:], widen(frame[columns[0]]))
+
+    def _lookup(self, frame, column, table):
+        categories, codes_by_month = self.LOOKUP_TABLES[table]
+        codes = codes_by_month[self.month_number(frame[column])]
+        return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=frame.index)
+
+    @staticmethod
+    def _bins(frame, column, bins, labels):
+        values = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype='float64')
+        # Intervalos (bins[i-1], bins[i]] como pd.cut(right=True); NaN y <= bins[0] quedan fuera
+        # (con bins[0] = -inf todo valor no nulo recibe categoría)
+        positions = np.searchsorted(np.asarray(bins, dtype='float64'), values, side='left')
+        codes = np.where((positions >= 1) & (positions < len(bins)), positions - 1, -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=labels, ordered=True), index=frame.index)
+
+    def compute(self, entry, frame):
+        """Serie de la columna derivada entry (frame debe tener sus requires)"""
+        kind = entry['kind']
+        if kind == 'date':
+            return self._date(frame, *entry['requires'])
+        if kind == 'sum':
+            return self._sum(frame, entry['requires'])
+        if kind == 'lookup':
+            return self._lookup(frame, entry['requires'][0], entry['table'])
+        if kind == 'bins':
+            return self._bins(frame, entry['requires'][0], entry['bins'], entry['labels'])
+        raise ValueError(f"Tipo de columna derivada desconocido: {kind}")
+
+    def apply(self, data):
+        """Añade a data las columnas cuyos requires existen"""
+        for entry in self.spec:
+            if all(col in data.columns for col in entry['requires']):
+                data[entry['name']] = self.compute(entry, data)
+        return data
 
 class DataCleaner:
     """Clase para limpieza y transformación de datos"""
-    def __init__(self, data):
+    DATE_COLUMNS = ['reservation_status_date', 'arrival_date']
+    # Columna de texto -> formato estándar
+    TEXT_FORMATS = {
+        'country': lambda values: values.str.upper(),
+        'customer_type': lambda values: values.str.capitalize()
+    }
+
+    def __init__(self, data, fill_values=None, source_path=None):
         self.data = data
-
+        # Archivo de origen, usado como clave de la caché de formatos de fecha
+        self.date_parser = DateParser(source_path)
+        # Valores de relleno precalculados (p. ej. medianas globales en modo streaming)
+        self.fill_values = fill_values
+        # Conteo de nulos por columna, calculado en _handle_nulls
+        self.null_profile = None
+
+    @instrumented('clean')
     def clean_data(self):
         """Realiza todas las operaciones de limpieza"""
         if self.data is None:
@@ -118,72 +1231,847 @@ class DataCleaner:
             print(f"Error durante la limpieza: {str(e)}")
             return None
 
+    @instrumented('clean')
     def _convert_dates(self):
         """Convertir todas las columnas de fecha a formato estándar"""
-        date_columns = ['reservation_status_date', 'arrival_date']
-
-        for col in date_columns:
+        for col in self.DATE_COLUMNS:
             if col in self.data.columns:
-                try:
-                        # Intentar varios formatos de fecha comunes
-                        self.data[col] = pd.to_datetime(
-                        self.data[col],
-                        errors='coerce',
-                        format='mixed',
-                        dayfirst=True
-                    )
-                except:
-                    # Si falla, simplemente mantener como está
-                    pass
+                self.data[col] = self.parse_date_column(self.data[col], col)
+
+    def parse_date_column(self, series, column):
+        try:
+            # Formatos inferidos y vectorizados, con respaldo al parser mixto
+            return self.date_parser.parse(series, column)
+        except:
+            # Si falla, simplemente mantener como está
+            return series
 
+    @instrumented('clean')
     def _handle_nulls(self):
-        """Manejar valores nulos según el tipo de columna"""
-        for col in self.data.columns:
-            if self.data[col].isnull().any():
-                if self.data[col].dtype == 'object':
-                    # Para columnas categóricas, usar 'Desconocido'
-                    self.data[col].fillna('Desconocido', inplace=True)
-                else:
-                    # Para numéricas, usar la mediana
-                    self.data[col].fillna(self.data[col].median(), inplace=True)
+        """Manejar valores nulos según el tipo de columna
 
-    def _create_new_columns(self):
-        """Crear nuevas columnas derivadas"""
-        # Duración de la estancia
-        if 'arrival_date' in self.data.columns and 'departure_date' in self.data.columns:
-            self.data['stay_duration'] = (self.data['departure_date'] - self.data['arrival_date']).dt.days
+        Calcula en una sola pasada el conteo de nulos y las medianas de las
+        columnas no categóricas, y aplica un único fillna con un valor por
+        columna. El conteo queda disponible en self.null_profile.
+        """
+        null_counts = self.data.isnull().sum()
+        self.null_profile = null_counts
 
-        # Total de personas (adultos + niños + bebés)
-        person_columns = ['adults', 'children', 'babies']
-        if all(col in self.data.columns for col in person_columns):
-            self.data['total_guests'] = self.data[person_columns].sum(axis=1)
+        null_columns = null_counts.index[null_counts > 0]
+        object_columns = [col for col in null_columns if is_text_dtype(self.data[col].dtype)]
+        numeric_columns = [col for col in null_columns if not is_text_dtype(self.data[col].dtype)]
 
-        # Temporada (alta/media/baja) basada en el mes de llegada
-        if 'arrival_date_month' in self.data.columns:
-            seasons = {
-                'January': 'Baja', 'February': 'Baja', 'March': 'Media',
-                'April': 'Media', 'May': 'Media', 'June': 'Alta',
-                'July': 'Alta', 'August': 'Alta', 'September': 'Media',
-                'October': 'Media', 'November': 'Media', 'December': 'Alta'
-            }
-            self.data['season'] = self.data['arrival_date_month'].map(seasons)
+        # Las columnas category necesitan la categoría antes de rellenar
+        for col in object_columns:
+            series = self.data[col]
+            if isinstance(series.dtype, pd.CategoricalDtype) and 'Desconocido' not in series.cat.categories:
+                self.data[col] = series.cat.add_categories('Desconocido')
+
+        # Para columnas categóricas, usar 'Desconocido'
+        fill_map = {col: 'Desconocido' for col in object_columns}
+
+        # Para numéricas, usar la mediana (o la mediana global precalculada)
+        precomputed = self.fill_values or {}
+        pending = [col for col in numeric_columns if col not in precomputed]
+        if pending:
+            fill_map.update(self.data[pending].median().to_dict())
+        fill_map.update({col: precomputed[col] for col in numeric_columns if col in precomputed})
 
+        if fill_map:
+            self.data = self.data.fillna(fill_map)
+
+        return self.null_profile
+
+    @instrumented('clean')
+    def _create_new_columns(self):
+        """Crear nuevas columnas derivadas (ver DerivedColumnEngine.SPEC)"""
+        DerivedColumnEngine().apply(self.data)
+
+    @instrumented('clean')
     def _standardize_formats(self):
         """Estandarizar formatos de texto"""
-        if 'country' in self.data.columns:
-            self.data['country'] = self.data['country'].str.upper()
+        for col, func in self.TEXT_FORMATS.items():
+            if col in self.data.columns:
+                self.data[col] = self._apply_str(self.data[col], func)
+
+    @staticmethod
+    def _apply_str(series, func):
+        """Aplica una operación de texto; en columnas category, solo a las etiquetas"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return map_categories(series, func)
+        return func(series)
+
+
+
+class TransformStep:
+    """Paso de LazyPipeline que declara las columnas que lee y las que escribe
+
+    Paso por columna (produces=None): func(serie, columna) -> serie, aplicado
+    a cada columna de columns (None = todas) que siga siendo necesaria.
+    Paso derivado: crea produces con func(frame de requires) -> serie.
+    """
+    def __init__(self, name, func, columns=None, produces=None, requires=()):
+        self.name = name
+        self.func = func
+        self.columns = columns
+        self.produces = produces
+        self.requires = list(requires)
+
+    @property
+    def derived(self):
+        return self.produces is not None
+
+class LazyPipeline:
+    """Carga + limpieza planificadas a partir de las columnas que se van a usar
+
+    Equivale a DataCleaner(loader.load_data()).clean_data()[output_columns],
+    pero el planificador recorre los pasos de atrás hacia adelante y:
+    - omite los pasos (y columnas de cada paso) cuyo resultado nadie usa,
+      p. ej. no convierte reservation_status_date si el destino no la pide;
+    - pasa al loader solo las columnas necesarias (CSV, Parquet, Arrow y
+      dataset particionado; en el resto se descartan nada más cargar);
+    - ejecuta los pasos sobre un diccionario de series y arma el DataFrame
+      una sola vez al final, en lugar de reescribir el frame en cada paso.
+    """
+    def __init__(self, loader, output_columns=None, source_path=None, steps=None):
+        self.loader = loader
+        self.output_columns = list(output_columns) if output_columns is not None else None
+        self.cleaner = DataCleaner(None, source_path=source_path)
+        self.steps = steps or self.default_steps(self.cleaner)
+
+    @staticmethod
+    def default_steps(cleaner):
+        """Los pasos de DataCleaner.clean_data, en el mismo orden"""
+        steps = [
+            TransformStep('fechas', cleaner.parse_date_column, columns=DataCleaner.DATE_COLUMNS),
+            TransformStep('nulos', LazyPipeline._fill_nulls)
+        ]
+        engine = DerivedColumnEngine()
+        steps += [
+            TransformStep(f"derivada:{entry['name']}", functools.partial(engine.compute, entry),
+                          produces=entry['name'], requires=entry['requires'])
+            for entry in engine.spec
+        ]
+        steps += [
+            TransformStep(f'formato:{col}', lambda series, _, func=func: DataCleaner._apply_str(series, func), columns=[col])
+            for col, func in DataCleaner.TEXT_FORMATS.items()
+        ]
+        return steps
+
+    @staticmethod
+    def _fill_nulls(series, column):
+        """Igual que DataCleaner._handle_nulls para una sola columna"""
+        if not series.hasnans:
+            return series
+        if is_text_dtype(series.dtype):
+            if isinstance(series.dtype, pd.CategoricalDtype) and 'Desconocido' not in series.cat.categories:
+                series = series.cat.add_categories('Desconocido')
+            return series.fillna('Desconocido')
+        return series.fillna(series.median())
+
+    def plan(self):
+        """Columnas a leer y, por paso, las columnas a procesar (None = todas)
+
+        Devuelve {'source_columns': [...] o None, 'steps': [(paso, columnas)]}.
+        """
+        if self.output_columns is None:
+            return {'source_columns': None, 'steps': [(step, None) for step in self.steps]}
+
+        available = self.loader.schema_columns()
+        producible = set(available) if available is not None else None
+        if producible is not None:
+            for step in self.steps:
+                if step.derived and all(col in producible for col in step.requires):
+                    producible.add(step.produces)
+
+        needed = set(self.output_columns)
+        planned = []
+        for step in reversed(self.steps):
+            if step.derived:
+                inputs_exist = producible is None or all(col in producible for col in step.requires)
+                if step.produces in needed and inputs_exist:
+                    planned.append((step, None))
+                    needed.discard(step.produces)
+                    needed.update(step.requires)
+            else:
+                columns = needed if step.columns is None else needed & set(step.columns)
+                if columns:
+                    planned.append((step, set(columns)))
+        planned.reverse()
+
+        if available is not None:
+            source_columns = [col for col in available if col in needed]
+        else:
+            source_columns = sorted(needed)
+        return {'source_columns': source_columns, 'steps': planned}
+
+    def describe(self):
+        """Texto legible del plan"""
+        plan = self.plan()
+        lines = [f"Leer: {'todas las columnas' if plan['source_columns'] is None else ', '.join(plan['source_columns'])}"]
+        for step, columns in plan['steps']:
+            target = step.produces if step.derived else ('todas' if columns is None else ', '.join(sorted(columns)))
+            lines.append(f"  {step.name}: {target}")
+        return "\n".join(lines)
+
+    def collect(self):
+        """Ejecuta el plan y devuelve el DataFrame limpio"""
+        try:
+            plan = self.plan()
+            if plan['source_columns'] is not None and hasattr(self.loader, 'columns'):
+                self.loader.columns = plan['source_columns']
+
+            data = self.loader.load_data()
+            if data is None:
+                return None
+            return self._execute(data, plan)
+        except Exception as e:
+            print(f"Error durante la limpieza: {str(e)}")
+            return None
+
+    @instrumented('clean')
+    def _execute(self, data, plan):
+        if plan['source_columns'] is not None:
+            data = data[[col for col in data.columns if col in set(plan['source_columns'])]]
+
+        columns = {col: data[col] for col in data.columns}
+        for step, targets in plan['steps']:
+            if step.derived:
+                if all(col in columns for col in step.requires):
+                    frame = pd.DataFrame({col: columns[col] for col in step.requires}, copy=False)
+                    columns[step.produces] = step.func(frame)
+                continue
+            candidates = step.columns if step.columns is not None else list(columns)
+            for col in candidates:
+                if col in columns and (targets is None or col in targets):
+                    columns[col] = step.func(columns[col], col)
+
+        result = pd.DataFrame(columns, copy=False)
+        if self.output_columns is not None:
+            result = result[[col for col in self.output_columns if col in result.columns]]
+        return result
+
+class ColumnStatistics:
+    """Estadísticas globales exactas acumuladas bloque a bloque
+
+    Guarda el tipo común de cada columna y el conteo de valores de las
+    columnas numéricas/fecha (la memoria depende del número de valores
+    distintos, no del número de filas). Con esos conteos se obtiene la misma
+    mediana que calcularía _handle_nulls sobre el conjunto completo.
+    """
+    def __init__(self):
+        self.dtypes = {}
+        self.counts = {}
+
+    def update(self, chunk):
+        """Acumula un bloque ya pasado por _convert_dates"""
+        for col in chunk.columns:
+            value_counts = None
+            if not is_text_dtype(chunk[col].dtype):
+                value_counts = chunk[col].value_counts(dropna=True)
+            self._add(col, chunk[col].dtype, value_counts)
+        return self
+
+    def merge(self, other):
+        """Combina las estadísticas de otro bloque o partición"""
+        for col, col_dtype in other.dtypes.items():
+            self._add(col, col_dtype, other.counts.get(col))
+        return self
+
+    def _add(self, col, col_dtype, value_counts):
+        if col in self.dtypes and self.dtypes[col] != col_dtype:
+            self.dtypes[col] = pd.api.types.find_common_type([self.dtypes[col], col_dtype])
+        else:
+            self.dtypes[col] = col_dtype
+
+        if value_counts is not None:
+            if col in self.counts:
+                self.counts[col] = self.counts[col].add(value_counts, fill_value=0)
+            else:
+                self.counts[col] = value_counts
+
+    def fill_values(self):
+        """Medianas globales de las columnas no categóricas"""
+        return {
+            col: self._median_from_counts(self.counts[col])
+            for col, col_dtype in self.dtypes.items()
+            if not is_text_dtype(col_dtype) and col in self.counts and len(self.counts[col])
+        }
+
+    @staticmethod
+    def _median_from_counts(value_counts):
+        """Mediana exacta a partir de un conteo de valores"""
+        value_counts = value_counts.sort_index()
+        cumulative = value_counts.cumsum().to_numpy()
+        total = int(cumulative[-1])
+        values = value_counts.index
+
+        lower = values[cumulative.searchsorted(total // 2 + 1 - (total % 2 == 0))]
+        upper = values[cumulative.searchsorted(total // 2 + 1)]
+        if lower == upper:
+            return lower
+        if isinstance(lower, pd.Timestamp):
+            return lower + (upper - lower) / 2
+        return (lower + upper) / 2
+
+class StreamingETL:
+    """Pipeline por bloques CSV -> limpieza -> CSV con memoria acotada
+
+    Hace dos pasadas sobre el archivo de entrada:
+    1. Estadísticas exactas con ColumnStatistics (tipos comunes y medianas).
+    2. Limpieza de cada bloque con esas medianas y escritura incremental.
+    """
+    def __init__(self, input_path, output_path, chunksize=100_000):
+        self.loader = CSVDataLoader(input_path)
+        self.output_path = output_path
+        self.chunksize = chunksize
+        self.dtypes = None
+        self.fill_values = None
+
+    def compute_statistics(self):
+        """Primera pasada: tipos comunes y medianas globales exactas"""
+        statistics = ColumnStatistics()
+
+        for chunk in self.loader.iter_chunks(self.chunksize):
+            # Las fechas se convierten antes de _handle_nulls, igual que en clean_data
+            DataCleaner(chunk, source_path=self.loader.file_path)._convert_dates()
+            statistics.update(chunk)
+
+        self.dtypes = statistics.dtypes
+        self.fill_values = statistics.fill_values()
+        return self.fill_values
+
+    def run(self):
+        """Ejecuta ambas pasadas y devuelve el número de filas escritas"""
+        try:
+            if self.fill_values is None:
+                self.compute_statistics()
+
+            rows = 0
+            first = True
+            for chunk in self.loader.iter_chunks(self.chunksize):
+                cleaner = DataCleaner(chunk, fill_values=self.fill_values, source_path=self.loader.file_path)
+                cleaner._convert_dates()
+                self._align_dtypes(cleaner.data)
+                cleaner._handle_nulls()
+                cleaner._create_new_columns()
+                cleaner._standardize_formats()
+
+                cleaner.data.to_csv(self.output_path, mode='w' if first else 'a', header=first, index=False)
+                rows += len(cleaner.data)
+                first = False
+
+            print(f"Streaming completado: {rows} filas escritas en {self.output_path}")
+            return rows
+        except FileNotFoundError:
+            print(f"Error: No se encontró el archivo {self.loader.file_path}")
+            return None
+        except Exception as e:
+            print(f"Error durante el streaming: {str(e)}")
+            return None
 
-        if 'customer_type' in self.data.columns:
-            self.data['customer_type'] = self.data['customer_type'].str.capitalize()
+    def _align_dtypes(self, chunk):
+        """Convierte cada columna del bloque al tipo común de todo el archivo"""
+        for col, col_dtype in self.dtypes.items():
+            if col in chunk.columns and chunk[col].dtype != col_dtype:
+                chunk[col] = chunk[col].astype(col_dtype)
 
 
 
 # Ruta donde se guardan los nuevos archivos (asegúrate de que esta ruta existe)
-salidan = 'C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\output\\'
+# (se puede cambiar con la variable de entorno ETL_OUTPUT_DIR)
+salidan = os.environ.get('ETL_OUTPUT_DIR', 'C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\output\\')
+
+# Carpeta de los archivos de entrada precargados (variable de entorno ETL_DATA_DIR)
+entradan = os.environ.get('ETL_DATA_DIR', 'C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\Data\\')
+
+def _clean_partition(partition, fill_values, changed):
+    """Tarea de proceso: limpieza de una partición con fechas convertidas y medianas globales
+
+    Devuelve solo las columnas modificadas (changed) y las derivadas nuevas.
+    """
+    cleaner = DataCleaner(partition, fill_values=fill_values)
+    cleaner._handle_nulls()
+    cleaner._create_new_columns()
+    cleaner._standardize_formats()
+    return cleaner.data[changed + [col for col in cleaner.data.columns if col not in partition.columns]]
+
+class ParallelDataCleaner:
+    """Limpieza en paralelo por particiones de filas (ProcessPoolExecutor)
+
+    Las particiones son bloques de filas de tamaño fijo o, con partition_by,
+    los grupos de una columna (p. ej. 'arrival_date_month'). El proceso
+    principal convierte las fechas (DateParser solo procesa los valores
+    distintos) y calcula las medianas globales con una pasada vectorizada;
+    cada partición se envía una sola vez a un proceso con esas medianas, de
+    modo que el resultado es idéntico al de DataCleaner. Solo viajan entre
+    procesos las columnas que la limpieza lee o modifica (con nulos, las que
+    usa DerivedColumnEngine y TEXT_FORMATS), no el DataFrame completo.
+    """
+    def __init__(self, data, workers=None, partition_by=None, partition_rows=None):
+        self.data = data
+        self.workers = workers or os.cpu_count() or 1
+        self.partition_by = partition_by
+        self.partition_rows = partition_rows
+
+    def _partitions(self):
+        """Posiciones de fila de cada partición"""
+        if self.partition_by and self.partition_by in self.data.columns:
+            groups = self.data.groupby(self.partition_by, sort=False, dropna=False).indices
+            return list(groups.values())
+        if self.partition_rows:
+            count = max(1, -(-len(self.data) // self.partition_rows))
+        else:
+            count = self.workers
+        return [part for part in np.array_split(np.arange(len(self.data)), count) if len(part)]
+
+    @instrumented('clean')
+    def clean_data(self):
+        """Equivalente paralelo de DataCleaner.clean_data"""
+        if self.data is None:
+            return None
+
+        try:
+            # Copia superficial: las columnas convertidas no modifican self.data
+            converter = DataCleaner(self.data.copy(deep=False))
+            converter._convert_dates()
+            data = converter.data
+
+            # Medianas globales de las columnas no categóricas con nulos, igual que _handle_nulls
+            has_nulls = data.isna().any()
+            null_columns = [col for col in data.columns if has_nulls[col]]
+            numeric_columns = [col for col in null_columns if not is_text_dtype(data[col].dtype)]
+            fill_values = data[numeric_columns].median().to_dict() if numeric_columns else {}
+
+            changed = [col for col in data.columns if col in null_columns or col in DataCleaner.TEXT_FORMATS]
+            required = {col for entry in DerivedColumnEngine.SPEC for col in entry['requires']}
+            sent = [data.columns.get_loc(col) for col in data.columns if col in changed or col in required]
+
+            positions = self._partitions()
+            partitions = [data.iloc[part, sent] for part in positions]
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                cleaned = list(executor.map(_clean_partition, partitions, [fill_values] * len(partitions),
+                                            [changed] * len(partitions)))
+
+            # Reconstruir el orden original de las filas y unir las columnas devueltas
+            order = np.argsort(np.concatenate(positions), kind='stable')
+            cleaned = pd.concat(cleaned).iloc[order]
+            cleaned.index = data.index
+            result = data.copy(deep=False)
+            for col in cleaned.columns:
+                result[col] = cleaned[col]
+            return result
+        except Exception as e:
+            print(f"Error durante la limpieza en paralelo: {str(e)}")
+            return None
+
+
+
+class PipelineCache:
+    """Caché direccionada por contenido del resultado de carga + limpieza
+
+    La clave de cada etapa combina el SHA-256 del archivo de origen (se
+    recalcula solo si cambian su tamaño o mtime), una variante (p. ej.
+    con optimización de tipos) y la huella del código de los pasos de
+    DataCleaner hasta esa etapa. Se guarda el resultado de cada paso en
+    formato Arrow, de modo que si solo cambió _create_new_columns se
+    reutiliza la salida cacheada de _handle_nulls (acierto parcial).
+    El directorio tiene un tamaño máximo con expulsión LRU.
+    """
+    STEPS = ['_convert_dates', '_handle_nulls', '_create_new_columns', '_standardize_formats']
+
+    def __init__(self, cache_dir=None, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir or os.path.join(salidan, 'pipeline_cache')
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        # Aciertos y fallos de la sesión: 'full', 'partial', 'miss'
+        self.stats = {'full': 0, 'partial': 0, 'miss': 0}
+
+    @staticmethod
+    def _step_dependencies():
+        """Código del que depende el resultado de cada paso"""
+        return {
+            '_convert_dates': [DataCleaner._convert_dates, DataCleaner.parse_date_column, DateParser],
+            '_handle_nulls': [DataCleaner._handle_nulls, is_text_dtype],
+            '_create_new_columns': [DataCleaner._create_new_columns, DerivedColumnEngine],
+            '_standardize_formats': [DataCleaner._standardize_formats, DataCleaner._apply_str, map_categories,
+                                     *DataCleaner.TEXT_FORMATS.values()],
+        }
+
+    @staticmethod
+    def _source_code(obj):
+        try:
+            return inspect.getsource(obj)
+        except (OSError, TypeError):
+            return getattr(obj, '__qualname__', repr(obj))
+
+    def step_fingerprints(self):
+        """Huella acumulada de los pasos: la etapa k depende de los pasos 0..k"""
+        digest = hashlib.sha256(pd.__version__.encode())
+        fingerprints = []
+        dependencies = self._step_dependencies()
+        for step in self.STEPS:
+            for obj in dependencies[step]:
+                digest.update(self._source_code(obj).encode())
+            fingerprints.append(digest.hexdigest())
+        return fingerprints
+
+    def _read_index(self):
+        index = read_json_state(self.index_path)
+        index.setdefault('entries', {})
+        index.setdefault('sources', {})
+        return index
+
+    def source_hash(self, source_path, index=None):
+        """SHA-256 del archivo de origen, memorizado por tamaño y mtime"""
+        index = index if index is not None else self._read_index()
+        key = os.path.abspath(source_path)
+        stat = os.stat(source_path)
+        known = index['sources'].get(key)
+        if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime:
+            return known['sha256']
+
+        sha256 = file_sha256(source_path)
+        index['sources'][key] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha256}
+        write_json_state(self.index_path, index)
+        return sha256
+
+    def _stage_keys(self, source_path, variant, index):
+        source = self.source_hash(source_path, index)
+        return [hashlib.sha256(f"{source}:{variant}:{fingerprint}".encode()).hexdigest()
+                for fingerprint in self.step_fingerprints()]
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.arrow')
+
+    def lookup(self, source_path, variant='default'):
+        """Devuelve (pasos completados, DataFrame) de la etapa más avanzada en caché
+
+        (0, None) si no hay ninguna etapa válida para este archivo y código.
+        """
+        index = self._read_index()
+        keys = self._stage_keys(source_path, variant, index)
+
+        for completed in range(len(keys), 0, -1):
+            key = keys[completed - 1]
+            if key in index['entries'] and os.path.exists(self._entry_path(key)):
+                data = pd.read_feather(self._entry_path(key))
+                index['entries'][key]['last_used'] = time.time()
+                write_json_state(self.index_path, index)
+
+                hit = 'full' if completed == len(keys) else 'partial'
+                self.stats[hit] += 1
+                print(f"Caché: acierto {'completo' if hit == 'full' else 'parcial'} "
+                      f"({completed}/{len(keys)} pasos, hasta {self.STEPS[completed - 1]})")
+                return completed, data
+
+        self.stats['miss'] += 1
+        print("Caché: sin acierto para este archivo y versión de la limpieza")
+        return 0, None
+
+    def _store(self, key, data, source_path, step):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data.to_feather(self._entry_path(key))
+        except Exception as e:
+            # Algunas columnas (p. ej. tipos mezclados) no se pueden guardar en Arrow
+            print(f"Aviso: no se pudo guardar la etapa {step} en la caché: {str(e)}")
+            return
+
+        index = self._read_index()
+        index['entries'][key] = {
+            'source': os.path.abspath(source_path),
+            'stage': step,
+            'size': os.path.getsize(self._entry_path(key)),
+            'last_used': time.time()
+        }
+        self._evict(index)
+        write_json_state(self.index_path, index)
+
+    def _evict(self, index):
+        """Elimina las entradas menos usadas hasta respetar max_bytes"""
+        entries = index['entries']
+        total = sum(entry['size'] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]['size']
+            del entries[key]
+            if os.path.exists(self._entry_path(key)):
+                os.remove(self._entry_path(key))
+
+    def invalidate(self, source_path=None):
+        """Borra las entradas de un archivo de origen, o toda la caché"""
+        index = self._read_index()
+        source = os.path.abspath(source_path) if source_path else None
+        for key in [k for k, entry in index['entries'].items() if source is None or entry['source'] == source]:
+            del index['entries'][key]
+            if os.path.exists(self._entry_path(key)):
+                os.remove(self._entry_path(key))
+        if source is None:
+            index['sources'] = {}
+        else:
+            index['sources'].pop(source, None)
+        write_json_state(self.index_path, index)
+
+    def clean(self, data, source_path, variant='default', completed_steps=0):
+        """Ejecuta los pasos pendientes de DataCleaner guardando cada etapa"""
+        if data is None:
+            return None
+
+        try:
+            keys = self._stage_keys(source_path, variant, self._read_index())
+            cleaner = DataCleaner(data, source_path=source_path)
+            for position in range(completed_steps, len(self.STEPS)):
+                step = self.STEPS[position]
+                getattr(cleaner, step)()
+                self._store(keys[position], cleaner.data, source_path, step)
+            return cleaner.data
+        except Exception as e:
+            print(f"Error durante la limpieza: {str(e)}")
+            return None
+
+
+
+class PartitionedDataset:
+    """Dataset Parquet particionado al estilo Hive para el almacén
+
+    Estructura: root/arrival_date_year=2016/arrival_date_month=August/hotel=Resort Hotel/part-0.parquet
+    (las columnas de partición no se repiten dentro de los archivos).
+    root/_manifest.json guarda las columnas, sus tipos y un hash del
+    contenido de cada partición: al reescribir solo se tocan las particiones
+    que cambiaron, y cada una se reemplaza de forma atómica (temporal +
+    os.replace), así que un lector nunca ve un archivo a medio escribir.
+    """
+    PARTITION_COLUMNS = ['arrival_date_year', 'arrival_date_month', 'hotel']
+    NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+    FILE_NAME = 'part-0.parquet'
+    OPERATORS = {
+        '=': lambda a, b: a == b, '==': lambda a, b: a == b, '!=': lambda a, b: a != b,
+        '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+        '>': lambda a, b: a > b, '>=': lambda a, b: a >= b,
+        'in': lambda a, b: a in b, 'not in': lambda a, b: a not in b
+    }
+
+    def __init__(self, root, partition_columns=None):
+        self.root = root
+        self.partition_columns = list(partition_columns or self.PARTITION_COLUMNS)
+        self.manifest_path = os.path.join(root, '_manifest.json')
+
+    def _encode(self, value):
+        if pd.isna(value):
+            return self.NULL_PARTITION
+        if isinstance(value, (float, np.floating)) and float(value).is_integer():
+            value = int(value)
+        return quote(str(value), safe=' ')
+
+    def _decode(self, text, dtype):
+        if text == self.NULL_PARTITION:
+            return None
+        value = unquote(text)
+        if pd.api.types.is_integer_dtype(dtype):
+            return int(value)
+        if pd.api.types.is_float_dtype(dtype):
+            return float(value)
+        return value
+
+    @staticmethod
+    def _digest(frame):
+        """Hash del contenido de una partición (valores, columnas y tipos)"""
+        digest = hashlib.sha256()
+        digest.update(repr([(col, str(dtype)) for col, dtype in frame.dtypes.items()]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def _write_partition(self, relative_path, frame):
+        directory = os.path.join(self.root, relative_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            frame.to_parquet(tmp_path, engine='pyarrow', index=False)
+            os.replace(tmp_path, os.path.join(directory, self.FILE_NAME))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def write(self, data, delete_missing=False, max_workers=None):
+        """Escribe las particiones que cambiaron
+
+        Las particiones que no aparecen en data se conservan (recarga
+        incremental) salvo con delete_missing=True. Devuelve un resumen con
+        las rutas escritas, sin cambios y eliminadas.
+        """
+        missing = [col for col in self.partition_columns if col not in data.columns]
+        if missing:
+            raise ValueError(f"Faltan las columnas de partición: {', '.join(missing)}")
+
+        manifest = read_json_state(self.manifest_path)
+        previous = manifest.get('partitions', {})
+        partitions = {}
+        pending = []
+        for keys, frame in data.groupby(self.partition_columns, dropna=False, observed=True, sort=True):
+            keys = keys if isinstance(keys, tuple) else (keys,)
+            relative_path = os.path.join(*(f"{col}={self._encode(value)}" for col, value in zip(self.partition_columns, keys)))
+            frame = frame.drop(columns=self.partition_columns)
+            sha256 = self._digest(frame)
+            partitions[relative_path] = {'rows': len(frame), 'sha256': sha256}
+
+            target = os.path.join(self.root, relative_path, self.FILE_NAME)
+            if previous.get(relative_path, {}).get('sha256') != sha256 or not os.path.exists(target):
+                pending.append((relative_path, frame))
+
+        # pyarrow libera el GIL al escribir, así que los hilos se solapan
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda item: self._write_partition(*item), pending))
+
+        deleted = []
+        for relative_path in previous:
+            if relative_path in partitions:
+                continue
+            if delete_missing:
+                shutil.rmtree(os.path.join(self.root, relative_path), ignore_errors=True)
+                deleted.append(relative_path)
+            else:
+                partitions[relative_path] = previous[relative_path]
+
+        write_json_state(self.manifest_path, {
+            'columns': list(data.columns),
+            'partition_columns': self.partition_columns,
+            'partition_dtypes': {col: str(data[col].dtype) for col in self.partition_columns},
+            'partitions': dict(sorted(partitions.items()))
+        })
+
+        written = [relative_path for relative_path, _ in pending]
+        print(f"Dataset particionado en {self.root}: {len(written)} particiones escritas, "
+              f"{len(partitions) - len(written)} sin cambios, {len(deleted)} eliminadas")
+        return {'written': written, 'unchanged': len(partitions) - len(written), 'deleted': deleted}
+
+    def _matches(self, column, value, filters):
+        for name, op, expected in filters:
+            if name != column:
+                continue
+            try:
+                if value is None or not self.OPERATORS[op](value, expected):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+    def partitions(self, filters=None):
+        """Lista (ruta del archivo, {columna: valor}) de las particiones que cumplen filters
+
+        Los filtros sobre columnas de partición se evalúan al recorrer cada
+        nivel de carpetas, así que las ramas descartadas ni siquiera se listan.
+        """
+        filters = filters or []
+        dtypes = read_json_state(self.manifest_path).get('partition_dtypes', {})
+        found = []
+
+        def walk(directory, level, values):
+            if level == len(self.partition_columns):
+                path = os.path.join(directory, self.FILE_NAME)
+                if os.path.exists(path):
+                    found.append((path, values))
+                return
+            column = self.partition_columns[level]
+            prefix = f"{column}="
+            for entry in sorted(os.listdir(directory)):
+                if not entry.startswith(prefix) or not os.path.isdir(os.path.join(directory, entry)):
+                    continue
+                value = self._decode(entry[len(prefix):], dtypes.get(column, 'object'))
+                if self._matches(column, value, filters):
+                    walk(os.path.join(directory, entry), level + 1, {**values, column: value})
+
+        if os.path.isdir(self.root):
+            walk(self.root, 0, {})
+        return found
+
+class PartitionedDataLoader(DataLoader):
+    """Cargador del dataset particionado con poda de particiones
+
+    filters usa el formato de ParquetDataLoader, p. ej.
+    [('arrival_date_year', '=', 2016), ('arrival_date_month', '=', 'August'),
+    ('hotel', '=', 'Resort Hotel')]: los filtros sobre columnas de partición
+    deciden qué carpetas se leen y el resto se pasa a pyarrow.
+    """
+    def __init__(self, root, filters=None, columns=None, max_workers=None):
+        self.dataset = PartitionedDataset(root)
+        self.filters = filters or []
+        self.columns = columns
+        self.max_workers = max_workers
+
+    def schema_columns(self):
+        return read_json_state(self.dataset.manifest_path).get('columns')
+
+    def _read_partition(self, path, values, file_columns, file_filters, dtypes):
+        frame = pd.read_parquet(path, engine='pyarrow', columns=file_columns, filters=file_filters or None)
+        for column, value in values.items():
+            if self.columns is None or column in self.columns:
+                dtype = dtypes.get(column, 'object')
+                dtype = 'object' if dtype == 'category' or value is None else dtype
+                frame[column] = pd.Series(value, index=frame.index, dtype=dtype)
+        return frame
+
+    @instrumented('load')
+    def load_data(self):
+        try:
+            manifest = read_json_state(self.dataset.manifest_path)
+            if not manifest:
+                print(f"Error: No se encontró el dataset particionado en {self.dataset.root}")
+                return None
+
+            partition_columns = manifest['partition_columns']
+            self.dataset.partition_columns = partition_columns
+            dtypes = manifest.get('partition_dtypes', {})
+            order = self.columns or manifest['columns']
+            file_columns = [col for col in order if col not in partition_columns] if self.columns else None
+            file_filters = [f for f in self.filters if f[0] not in partition_columns]
+
+            selected = self.dataset.partitions(self.filters)
+            print(f"Leyendo {len(selected)} de {len(manifest.get('partitions', {}))} particiones")
+            if not selected:
+                return pd.DataFrame(columns=order)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                frames = list(executor.map(
+                    lambda item: self._read_partition(*item, file_columns, file_filters, dtypes), selected))
+            return pd.concat(frames, ignore_index=True)[order]
+        except Exception as e:
+            print(f"Error al cargar el dataset particionado: {str(e)}")
+            return None
+
+class SerializedFrame:
+    """Serializaciones de un DataFrame compartidas entre varios destinos
+
+    Cada formato intermedio se calcula una sola vez, aunque lo pidan
+    varios hilos: el texto CSV (archivo CSV y COPY de PostgreSQL) y la
+    tabla de Arrow (Parquet y Arrow/Feather).
+    """
+    def __init__(self, data):
+        self.data = data
+        self._lock = threading.Lock()
+        self._csv_text = None
+        self._arrow_table = None
+
+    def csv_text(self):
+        with self._lock:
+            if self._csv_text is None:
+                self._csv_text = self.data.to_csv(index=False)
+            return self._csv_text
+
+    def arrow_table(self):
+        with self._lock:
+            if self._arrow_table is None:
+                import pyarrow as pa
+                self._arrow_table = pa.Table.from_pandas(self.data, preserve_index=False)
+            return self._arrow_table
 
 class DataSaver:
     """Clase para guardar datos en diferentes formatos"""
     @staticmethod
+    @instrumented('save')
     def save_data(data, save_option, file_path=None, db_config=None):
         """Guarda los datos según la opción seleccionada"""
         if data is None:
@@ -191,8 +2079,9 @@ class DataSaver:
             return False
 
         try:
-            # Asegurar que el directorio existe
-            os.makedirs(salidan, exist_ok=True)
+            # Asegurar que el directorio existe (el de la ruta indicada o salidan)
+            os.makedirs(os.path.dirname(file_path) if file_path and os.path.dirname(file_path) else salidan,
+                        exist_ok=True)
 
             if save_option == '1':  # CSV
                 if not file_path:
@@ -211,7 +2100,7 @@ class DataSaver:
                 else:
                     if not os.path.dirname(file_path):
                         file_path = os.path.join(salidan, file_path)
-                data.to_excel(file_path, index=False)
+                ExcelEngine().write(data, file_path)
                 print(f"Datos guardados exitosamente en {file_path}")
                 return True
 
@@ -225,15 +2114,67 @@ class DataSaver:
                 print(f"Datos guardados exitosamente en {file_path}")
                 return True
 
+            elif save_option == '8':  # NDJSON (opcionalmente .gz)
+                if not file_path:
+                    file_path = os.path.join(salidan, 'hotel_bookings_clean.ndjson')
+                else:
+                    if not os.path.dirname(file_path):
+                        file_path = os.path.join(salidan, file_path)
+                DataSaver._save_ndjson(data, file_path)
+                print(f"Datos guardados exitosamente en {file_path}")
+                return True
+
+            elif save_option == '6':  # Parquet
+                if not file_path:
+                    file_path = os.path.join(salidan, 'hotel_bookings_clean.parquet')
+                else:
+                    if not os.path.dirname(file_path):
+                        file_path = os.path.join(salidan, file_path)
+                # Row groups moderados para que los filtros puedan descartar bloques
+                data.to_parquet(file_path, engine='pyarrow', index=False, row_group_size=50_000)
+                print(f"Datos guardados exitosamente en {file_path}")
+                return True
+
+            elif save_option == '9':  # Dataset particionado (año/mes/hotel)
+                if not file_path:
+                    file_path = os.path.join(salidan, 'hotel_bookings_warehouse')
+                else:
+                    if not os.path.dirname(file_path):
+                        file_path = os.path.join(salidan, file_path)
+                PartitionedDataset(file_path).write(data)
+                return True
+
+            elif save_option == '10':  # Esquema en estrella (dimensiones + hechos)
+                builder = StarSchemaBuilder()
+                tables = builder.build(data)
+                if db_config:
+                    builder.load_postgres(tables, db_config)
+                else:
+                    if not file_path:
+                        file_path = os.path.join(salidan, 'star_schema')
+                    elif not os.path.dirname(file_path):
+                        file_path = os.path.join(salidan, file_path)
+                    builder.save(tables, file_path)
+                return True
+
+            elif save_option == '7':  # Arrow IPC / Feather
+                if not file_path:
+                    file_path = os.path.join(salidan, 'hotel_bookings_clean.arrow')
+                else:
+                    if not os.path.dirname(file_path):
+                        file_path = os.path.join(salidan, file_path)
+                # Sin compresión para poder abrirlo con memory map sin copias
+                data.to_feather(file_path, compression='uncompressed')
+                print(f"Datos guardados exitosamente en {file_path}")
+                return True
+
             elif save_option == '4':  # PostgreSQL
                 if not db_config:
                     print("Se requieren parámetros de conexión a la base de datos.")
                     return False
 
                 try:
-                    connection = psycopg2.connect(**db_config)
-                    data.to_sql('hotel_bookings_clean', connection, if_exists='replace', index=False)
-                    print("Datos guardados exitosamente en PostgreSQL")
+                    DataSaver._save_postgres_copy(data, db_config)
                     return True
                 except Exception as db_error:
                     print(f"Error al guardar en PostgreSQL: {str(db_error)}")
@@ -246,22 +2187,833 @@ class DataSaver:
             print(f"Error al guardar datos: {str(e)}")
             return False
 
+    @staticmethod
+    def save_many(data, sinks, max_workers=None):
+        """Guarda los mismos datos en varios destinos a la vez (ThreadPoolExecutor)
+
+        sinks es una lista de dicts con 'option' (igual que save_data) y,
+        según el caso, 'file_path' y 'db_config'. Las serializaciones se
+        comparten entre destinos compatibles y un fallo no detiene a los
+        demás. Devuelve una lista con el resultado y tiempo de cada destino.
+        """
+        if data is None:
+            print("No hay datos para guardar.")
+            return []
+
+        shared = SerializedFrame(data)
+        with ThreadPoolExecutor(max_workers=max_workers or len(sinks) or 1) as executor:
+            futures = [executor.submit(DataSaver._save_sink, data, sink, shared) for sink in sinks]
+            results = [future.result() for future in futures]
+
+        for result in results:
+            status = 'OK' if result['success'] else f"ERROR ({result.get('error', 'ver mensajes anteriores')})"
+            print(f"  {result['sink']:<50} {result['seconds']:>8.2f} s  {status}")
+        return results
 
+    @staticmethod
+    def _resolve_path(file_path, extension):
+        """Ruta final de un archivo de salida, igual que en save_data"""
+        if not file_path:
+            return os.path.join(salidan, f'hotel_bookings_clean.{extension}')
+        if not os.path.dirname(file_path):
+            return os.path.join(salidan, file_path)
+        return file_path
+
+    @staticmethod
+    @instrumented('save')
+    def _save_sink(data, sink, shared):
+        """Guarda un destino de save_many; nunca lanza excepciones
+
+        Emite un evento 'save' por destino, también en las rutas rápidas
+        que no pasan por save_data.
+        """
+        option = sink['option']
+        file_path = sink.get('file_path')
+        result = {'sink': file_path or {'4': 'PostgreSQL'}.get(option, option), 'success': False}
+        start = time.perf_counter()
+        try:
+            if option == '1':
+                file_path = result['sink'] = DataSaver._resolve_path(file_path, 'csv')
+                os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+                with open(file_path, 'w', encoding='utf-8', newline='') as file:
+                    file.write(shared.csv_text())
+                print(f"Datos guardados exitosamente en {file_path}")
+                result['success'] = True
+            elif option == '4' and sink.get('db_config'):
+                DataSaver._save_postgres_copy(data, sink['db_config'], csv_text=shared.csv_text())
+                result['success'] = True
+            elif option in ('6', '7'):
+                file_path = result['sink'] = DataSaver._resolve_path(file_path, 'parquet' if option == '6' else 'arrow')
+                os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+                if option == '6':
+                    import pyarrow.parquet as pq
+                    pq.write_table(shared.arrow_table(), file_path, row_group_size=50_000)
+                else:
+                    import pyarrow.feather as feather
+                    feather.write_feather(shared.arrow_table(), file_path, compression='uncompressed')
+                print(f"Datos guardados exitosamente en {file_path}")
+                result['success'] = True
+            else:
+                # save_data sin decorar: el evento de este destino ya lo emite _save_sink
+                result['success'] = DataSaver.save_data.__wrapped__(data, option, file_path, sink.get('db_config'))
+        except Exception as e:
+            result['error'] = str(e)
+            print(f"Error al guardar {result['sink']}: {str(e)}")
+        result['seconds'] = round(time.perf_counter() - start, 4)
+        return result
+
+    @staticmethod
+    def _save_ndjson(data, file_path, chunksize=50_000):
+        """Escribe un registro JSON por línea, por bloques; comprime con gzip si termina en .gz"""
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'wt', encoding='utf-8') as file:
+            for start in range(0, len(data), chunksize):
+                lines = data.iloc[start:start + chunksize].to_json(orient='records', lines=True, date_format='iso')
+                file.write(lines if lines.endswith('\n') else lines + '\n')
+
+    @staticmethod
+    def _postgres_type(dtype):
+        """Tipo de columna PostgreSQL equivalente a un dtype de pandas"""
+        if pd.api.types.is_bool_dtype(dtype):
+            return 'BOOLEAN'
+        if pd.api.types.is_integer_dtype(dtype):
+            return 'BIGINT'
+        if pd.api.types.is_float_dtype(dtype):
+            return 'DOUBLE PRECISION'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'TIMESTAMP'
+        return 'TEXT'
+
+    @staticmethod
+    def _column_definitions(data, key_column=None):
+        """Definición SQL de las columnas (con clave primaria opcional)"""
+        return sql.SQL(', ').join(
+            sql.SQL("{} {}{}").format(
+                sql.Identifier(col),
+                sql.SQL(DataSaver._postgres_type(dtype)),
+                sql.SQL(' PRIMARY KEY' if col == key_column else '')
+            )
+            for col, dtype in data.dtypes.items()
+        )
+
+    @staticmethod
+    def _copy_buffer(data):
+        """Serializa el DataFrame completo a CSV en memoria para COPY"""
+        buffer = io.StringIO()
+        data.to_csv(buffer, index=False, header=False, date_format='%Y-%m-%d %H:%M:%S')
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def _save_postgres_copy(data, db_config, table_name='hotel_bookings_clean', csv_text=None, append=False):
+        """Reemplaza la tabla y carga los datos con COPY FROM STDIN
+
+        csv_text permite reutilizar un CSV ya serializado (con encabezado).
+        Con append=True la tabla se conserva (se crea si no existe) y las
+        filas se añaden al final.
+        """
+        start = time.perf_counter()
+        table = sql.Identifier(*table_name.split('.'))
+        columns = DataSaver._column_definitions(data)
+        if csv_text is not None:
+            buffer = io.StringIO(csv_text)
+            copy_options = sql.SQL("FORMAT csv, HEADER true")
+        else:
+            buffer = DataSaver._copy_buffer(data)
+            copy_options = sql.SQL("FORMAT csv")
+
+        with postgres_pool.connection(db_config) as connection:
+            with connection.cursor() as cursor:
+                if append:
+                    cursor.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} ({})").format(table, columns))
+                else:
+                    cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(table))
+                    cursor.execute(sql.SQL("CREATE TABLE {} ({})").format(table, columns))
+                cursor.copy_expert(
+                    sql.SQL("COPY {} ({}) FROM STDIN WITH ({})").format(
+                        table, sql.SQL(', ').join(sql.Identifier(col) for col in data.columns), copy_options),
+                    buffer
+                )
+            connection.commit()
+
+        elapsed = time.perf_counter() - start
+        print(f"Datos guardados exitosamente en PostgreSQL ({len(data)} filas, {len(data) / max(elapsed, 1e-9):,.0f} filas/s)")
+
+    @staticmethod
+    def _upsert_postgres_copy(data, db_config, table_name='hotel_bookings_clean', key_column='booking_id'):
+        """Inserta o actualiza filas: COPY a una tabla temporal + INSERT ... ON CONFLICT"""
+        start = time.perf_counter()
+        table = sql.Identifier(*table_name.split('.'))
+        column_names = sql.SQL(', ').join(sql.Identifier(col) for col in data.columns)
+        updates = sql.SQL(', ').join(
+            sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(col))
+            for col in data.columns if col != key_column
+        )
+        buffer = DataSaver._copy_buffer(data)
+
+        with postgres_pool.connection(db_config) as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} ({})").format(
+                    table, DataSaver._column_definitions(data, key_column)))
+                # ON CONFLICT necesita una clave única en key_column (una tabla
+                # reemplazada con COPY, p. ej. por la opción 4, no la tiene)
+                cursor.execute(
+                    "SELECT 1 FROM pg_index i JOIN pg_attribute a "
+                    "ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey) "
+                    "WHERE i.indrelid = to_regclass(%s) AND i.indisunique AND i.indnatts = 1 AND a.attname = %s",
+                    (table_name, key_column)
+                )
+                if cursor.fetchone() is None:
+                    raise ValueError(f"La tabla {table_name} no tiene clave primaria en {key_column}; "
+                                     "use una tabla distinta para la carga incremental")
+                cursor.execute(sql.SQL(
+                    "CREATE TEMP TABLE etl_staging (LIKE {} INCLUDING DEFAULTS) ON COMMIT DROP"
+                ).format(table))
+                cursor.copy_expert(
+                    sql.SQL("COPY etl_staging ({}) FROM STDIN WITH (FORMAT csv)").format(column_names),
+                    buffer
+                )
+                cursor.execute(sql.SQL(
+                    "INSERT INTO {table} ({cols}) SELECT {cols} FROM etl_staging "
+                    "ON CONFLICT ({key}) DO UPDATE SET {updates}"
+                ).format(table=table, cols=column_names, key=sql.Identifier(key_column), updates=updates))
+            connection.commit()
+
+        elapsed = time.perf_counter() - start
+        print(f"Upsert completado en PostgreSQL ({len(data)} filas, {len(data) / max(elapsed, 1e-9):,.0f} filas/s)")
+
+
+
+class IncrementalETL:
+    """Ejecución incremental CSV -> limpieza -> upsert en PostgreSQL
+
+    Guarda por archivo de origen, en un JSON de estado, la marca de agua
+    (máxima reservation_status_date cargada), el tamaño ya procesado y el
+    hash de ese prefijo del archivo:
+    - Si el prefijo no cambió, solo se leen los bytes añadidos al final.
+    - Si cambió, se relee el archivo y se extraen las filas con fecha
+      >= marca de agua (o sin fecha).
+    Las filas se identifican con booking_id, calculado a partir de
+    identity_hash (hash de las columnas que no cambian mientras la reserva
+    está abierta) y de la posición de la fila entre las que tienen el mismo
+    identity_hash: las reservas idénticas (el extracto tiene miles) se
+    conservan todas, y una reserva editada actualiza su fila. Al leer solo
+    el final del archivo, la posición continúa desde las filas con el mismo
+    hash que ya están en la tabla. La tabla se crea con booking_id como
+    clave primaria y es distinta de la que reemplaza la opción 4.
+    Las medianas de _handle_nulls se calculan sobre el archivo completo
+    (ColumnStatistics) cada vez que se relee y se guardan en el estado, de
+    modo que las filas nuevas se rellenan igual que en una ejecución completa.
+    """
+    # Columnas que cambian durante la vida de una reserva (no forman la clave)
+    STATUS_COLUMNS = ['is_canceled', 'reservation_status', 'reservation_status_date']
+    MUTABLE_COLUMNS = STATUS_COLUMNS + [
+        'adr', 'assigned_room_type', 'booking_changes', 'deposit_type', 'days_in_waiting_list',
+        'total_of_special_requests', 'required_car_parking_spaces'
+    ]
+
+    def __init__(self, input_path, db_config, table_name='hotel_bookings_incremental', state_path=None,
+                 date_column='reservation_status_date'):
+        self.input_path = input_path
+        self.db_config = db_config
+        self.table_name = table_name
+        self.state_path = state_path or os.path.join(salidan, 'incremental_state.json')
+        self.date_column = date_column
+        self.source_key = os.path.abspath(input_path)
+
+    def run(self):
+        """Procesa solo las filas nuevas o modificadas; devuelve cuántas se cargaron"""
+        try:
+            state = read_json_state(self.state_path)
+            source_state = state.get(self.source_key, {})
+
+            data, columns, keys, fill_values = self._extract(source_state)
+            size = os.path.getsize(self.input_path)
+            if data.empty:
+                print("Sin filas nuevas desde la última ejecución.")
+                return 0
+
+            clean = DataCleaner(data, fill_values=fill_values, source_path=self.input_path).clean_data()
+            if clean is None:
+                return None
+            clean.insert(0, 'identity_hash', keys['identity_hash'].to_numpy())
+            clean.insert(0, 'booking_id', keys['booking_id'].to_numpy())
+
+            DataSaver._upsert_postgres_copy(clean, self.db_config, self.table_name, 'booking_id')
+
+            # Actualizar el estado solo después de un upsert exitoso
+            marks = []
+            if self.date_column in clean.columns:
+                marks.append(clean[self.date_column].max())
+            if source_state.get('high_water_mark'):
+                marks.append(pd.Timestamp(source_state['high_water_mark']))
+            high_water_mark = max((mark for mark in marks if pd.notna(mark)), default=None)
+            state[self.source_key] = {
+                'high_water_mark': high_water_mark.isoformat() if high_water_mark is not None else None,
+                'offset': size,
+                'prefix_sha256': self._prefix_hash(size),
+                'columns': columns,
+                'fill_values': self._dump_fill_values(fill_values)
+            }
+            write_json_state(self.state_path, state)
+
+            print(f"Carga incremental: {len(clean)} filas (marca de agua {state[self.source_key]['high_water_mark']})")
+            return len(clean)
+        except FileNotFoundError:
+            print(f"Error: No se encontró el archivo {self.input_path}")
+            return None
+        except Exception as e:
+            print(f"Error durante la carga incremental: {str(e)}")
+            return None
+
+    def _prefix_hash(self, length):
+        """SHA-256 de los primeros length bytes del archivo"""
+        return file_sha256(self.input_path, length)
+
+    @staticmethod
+    def _dump_fill_values(fill_values):
+        """Valores de relleno en forma JSON (las fechas como {'timestamp': ISO})"""
+        return {col: {'timestamp': value.isoformat()} if isinstance(value, pd.Timestamp) else float(value)
+                for col, value in fill_values.items()}
+
+    @staticmethod
+    def _load_fill_values(stored):
+        return {col: pd.Timestamp(value['timestamp']) if isinstance(value, dict) else value
+                for col, value in stored.items()}
+
+    def _extract(self, source_state):
+        """Devuelve (filas nuevas o modificadas, columnas del archivo, claves de esas filas, valores de relleno)"""
+        offset = source_state.get('offset')
+        columns = source_state.get('columns')
+        stored_fill_values = source_state.get('fill_values')
+        size = os.path.getsize(self.input_path)
+
+        if (offset and columns and stored_fill_values is not None and size >= offset
+                and self._prefix_hash(offset) == source_state.get('prefix_sha256')):
+            with open(self.input_path, 'rb') as file:
+                file.seek(offset - 1)
+                # Solo si la parte ya procesada terminaba en un salto de línea completo
+                if file.read(1) == b'\n':
+                    fill_values = self._load_fill_values(stored_fill_values)
+                    if size == offset:
+                        return (pd.DataFrame(columns=columns), columns,
+                                pd.DataFrame(columns=['booking_id', 'identity_hash']), fill_values)
+                    data = pd.read_csv(file, header=None, names=columns)
+                    identity = self._identity_hash(data)
+                    # Las filas anteriores del archivo ya están en la tabla
+                    previous = self._stored_counts(np.unique(identity))
+                    start = pd.Series(identity).map(previous).fillna(0).astype('int64').to_numpy()
+                    return data, columns, self._keys(identity, start), fill_values
+
+        data = CSVDataLoader(self.input_path).load_data()
+        if data is None:
+            raise FileNotFoundError(self.input_path)
+        columns = list(data.columns)
+        # Las claves se calculan sobre el archivo completo, antes de filtrar
+        keys = self._keys(self._identity_hash(data))
+        # Medianas globales: las fechas se convierten antes, igual que en clean_data
+        cleaner = DataCleaner(data, source_path=self.input_path)
+        cleaner._convert_dates()
+        data = cleaner.data
+        fill_values = ColumnStatistics().update(data).fill_values()
+
+        high_water_mark = source_state.get('high_water_mark')
+        if high_water_mark and self.date_column in data.columns:
+            dates = DateParser(self.input_path).parse(data[self.date_column], self.date_column)
+            selected = ((dates >= pd.Timestamp(high_water_mark)) | dates.isna()).to_numpy()
+            data = data[selected].reset_index(drop=True)
+            keys = keys[selected].reset_index(drop=True)
+        return data, columns, keys, fill_values
+
+    def _keys(self, identity, start=0):
+        """booking_id = hash de (identity_hash, posición entre las filas con ese hash)"""
+        occurrence = pd.Series(identity).groupby(identity).cumcount().to_numpy() + start
+        keys = pd.DataFrame({'identity_hash': identity, 'occurrence': occurrence})
+        booking_id = pd.util.hash_pandas_object(keys, index=False).to_numpy().view('int64')
+        return pd.DataFrame({'booking_id': booking_id, 'identity_hash': identity})
+
+    def _stored_counts(self, identity_hashes):
+        """Filas ya cargadas por identity_hash (solo para los hashes pedidos)"""
+        with postgres_pool.connection(self.db_config) as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s)", (self.table_name,))
+                if cursor.fetchone()[0] is None:
+                    return {}
+                cursor.execute(sql.SQL(
+                    "SELECT identity_hash, count(*) FROM {} WHERE identity_hash = ANY(%s) GROUP BY identity_hash"
+                ).format(sql.Identifier(*self.table_name.split('.'))), ([int(value) for value in identity_hashes],))
+                return dict(cursor.fetchall())
+
+    def _identity_hash(self, data):
+        """Hash estable (BIGINT) de las columnas que no cambian durante la reserva"""
+        key_columns = [col for col in data.columns if col not in self.MUTABLE_COLUMNS]
+        # Normalizar tipos para que un lote pequeño (enteros) y uno grande
+        # (flotantes por nulos) produzcan el mismo hash
+        normalized = pd.DataFrame({
+            col: data[col].astype('float64') if pd.api.types.is_numeric_dtype(data[col]) else data[col].astype(str)
+            for col in key_columns
+        })
+        hashes = pd.util.hash_pandas_object(normalized, index=False)
+        return hashes.to_numpy().view('int64')
+
+class StarSchemaBuilder:
+    """Modelo dimensional (esquema en estrella) a partir de los datos limpios
+
+    Tablas: dim_hotel, dim_country, dim_customer_type, dim_date y
+    fact_booking. Las claves sustitutas se asignan con pd.factorize (cada
+    valor distinto una vez) y una búsqueda con hash (pd.Index.get_indexer)
+    contra el mapa valor -> clave guardado en key_cache_path, así que las
+    claves son estables entre ejecuciones y una carga incremental no
+    necesita leer las dimensiones de la base de datos. La clave 0 es el
+    miembro 'Desconocido': valores nulos y el relleno de DataCleaner (en
+    cualquier mayúscula/minúscula, p. ej. 'DESCONOCIDO' en country).
+    dim_date usa la clave AAAAMMDD de la fecha de llegada.
+    """
+    # tabla: (clave sustituta, columna natural)
+    DIMENSIONS = {
+        'dim_hotel': ('hotel_key', 'hotel'),
+        'dim_country': ('country_key', 'country'),
+        'dim_customer_type': ('customer_type_key', 'customer_type')
+    }
+    DATE_COLUMNS = ['arrival_date_year', 'arrival_date_month', 'arrival_date_day_of_month']
+    MONTHS = DerivedColumnEngine.MONTHS
+    UNKNOWN = 'Desconocido'
+    _lock = threading.Lock()
+
+    def __init__(self, key_cache_path=None):
+        self.key_cache_path = key_cache_path or os.path.join(salidan, 'dimension_keys.json')
+
+    @classmethod
+    def _assign_keys(cls, series, key_map):
+        """Claves de cada fila; añade a key_map los valores nuevos"""
+        key_map.setdefault(cls.UNKNOWN, 0)
+        codes, uniques = pd.factorize(series)
+        uniques = np.asarray(uniques, dtype=object).astype(str)
+        # El relleno de DataCleaner ('Desconocido', 'DESCONOCIDO', ...) es el miembro 0
+        uniques = pd.Index(np.where(np.char.lower(uniques.astype('U')) == cls.UNKNOWN.lower(), cls.UNKNOWN, uniques))
+
+        known = pd.Index(list(key_map.keys()), dtype=object)
+        known_keys = np.fromiter(key_map.values(), dtype=np.int64, count=len(key_map))
+        positions = known.get_indexer(uniques)
+        unique_keys = np.where(positions >= 0, known_keys[positions] if len(known_keys) else 0, 0)
+
+        new = positions < 0
+        if new.any():
+            first = (int(known_keys.max()) if len(known_keys) else 0) + 1
+            unique_keys[new] = np.arange(first, first + new.sum())
+            key_map.update(zip(uniques[new], unique_keys[new].tolist()))
+
+        # Código -1 (nulo) -> miembro desconocido
+        return np.where(codes >= 0, unique_keys[codes] if len(unique_keys) else 0, 0)
+
+    def _date_keys(self, data):
+        """Clave AAAAMMDD con aritmética entera; 0 si la fecha no es válida"""
+        month = DerivedColumnEngine.month_number(data['arrival_date_month']).astype('float64')
+        month = pd.Series(np.where(month > 0, month, np.nan), index=data.index)
+        # En float64: con --optimize-dtypes el año es int16 y year * 10000 desbordaría
+        year = pd.to_numeric(data['arrival_date_year'], errors='coerce').astype('float64')
+        day = pd.to_numeric(data['arrival_date_day_of_month'], errors='coerce').astype('float64')
+        keys = year * 10000 + month * 100 + day
+        keys = keys.fillna(0).astype('int64').to_numpy()
+        # Validar solo las claves distintas (p. ej. 31 de febrero -> 0)
+        unique_keys = np.unique(keys)
+        valid = pd.to_datetime(unique_keys.astype(str), format='%Y%m%d', errors='coerce').notna()
+        return np.where(np.isin(keys, unique_keys[valid]), keys, 0)
+
+    def _dim_date(self, date_keys):
+        keys = np.unique(date_keys[date_keys > 0])
+        dates = pd.to_datetime(keys.astype(str), format='%Y%m%d')
+        dim = pd.DataFrame({
+            'date_key': keys, 'date': dates, 'year': dates.year, 'quarter': dates.quarter,
+            'month': dates.month, 'month_name': np.asarray(self.MONTHS, dtype=object)[dates.month - 1],
+            'day': dates.day, 'week_number': dates.isocalendar().week.to_numpy(), 'day_of_week': dates.dayofweek
+        })
+        unknown = pd.DataFrame({'date_key': [0], 'month_name': [self.UNKNOWN]})
+        integer_columns = ['year', 'quarter', 'month', 'day', 'week_number', 'day_of_week']
+        return pd.concat([unknown, dim], ignore_index=True)[dim.columns].astype(
+            {'date_key': 'int64', **{col: 'Int64' for col in integer_columns}})
+
+    def build(self, data):
+        """Devuelve {nombre de tabla: DataFrame} con las dimensiones y los hechos"""
+        missing = [col for _, col in self.DIMENSIONS.values() if col not in data.columns]
+        missing += [col for col in self.DATE_COLUMNS if col not in data.columns]
+        if missing:
+            raise ValueError(f"Faltan columnas para el esquema en estrella: {', '.join(missing)}")
+
+        tables = {}
+        fact = {}
+        with self._lock:
+            cache = read_json_state(self.key_cache_path)
+            for table, (key, column) in self.DIMENSIONS.items():
+                key_map = cache.setdefault(table, {self.UNKNOWN: 0})
+                fact[key] = self._assign_keys(data[column], key_map)
+                tables[table] = pd.DataFrame({
+                    key: np.fromiter(key_map.values(), dtype=np.int64, count=len(key_map)),
+                    column: list(key_map.keys())
+                }).sort_values(key, ignore_index=True)
+            write_json_state(self.key_cache_path, cache)
+
+        fact['arrival_date_key'] = self._date_keys(data)
+        tables['dim_date'] = self._dim_date(fact['arrival_date_key'])
+
+        # Hechos: claves + columnas que no están en ninguna dimensión
+        moved = [col for _, col in self.DIMENSIONS.values()] + self.DATE_COLUMNS + ['arrival_date_week_number', 'arrival_date']
+        measures = data.drop(columns=[col for col in moved if col in data.columns])
+        tables['fact_booking'] = pd.concat([pd.DataFrame(fact, index=data.index), measures], axis=1).reset_index(drop=True)
+        print("Esquema en estrella: " + ", ".join(f"{name} ({len(table)} filas)" for name, table in tables.items()))
+        return tables
+
+    @staticmethod
+    def save(tables, output_dir):
+        """Guarda cada tabla como Parquet en output_dir (en paralelo)"""
+        os.makedirs(output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+            list(executor.map(
+                lambda item: item[1].to_parquet(os.path.join(output_dir, f"{item[0]}.parquet"), engine='pyarrow', index=False),
+                tables.items()
+            ))
+        print(f"Esquema en estrella guardado en {output_dir}")
+
+    def load_postgres(self, tables, db_config, append=False):
+        """Dimensiones con upsert por clave; hechos con COPY (reemplazo o append)"""
+        keys = {table: key for table, (key, _) in self.DIMENSIONS.items()}
+        keys['dim_date'] = 'date_key'
+        with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+            list(executor.map(lambda table: DataSaver._upsert_postgres_copy(tables[table], db_config, table, keys[table]), keys))
+        DataSaver._save_postgres_copy(tables['fact_booking'], db_config, 'fact_booking', append=append)
+
+
+class DataValidator:
+    """Validación de calidad de datos y conciliación origen/destino
+
+    validate / validate_source revisan bloque a bloque (en paralelo, con una
+    ventana acotada de bloques en memoria):
+    - esquema: columnas esperadas, faltantes y de tipo incorrecto;
+    - tasa de nulos por columna (MAX_NULL_RATE o NULL_RATE_LIMITS);
+    - rangos (RANGES) y valores permitidos (ALLOWED_VALUES), fila a fila;
+    - número de filas, si se indica expected_rows.
+    Pasa si no hay fallos de esquema, nulos o conteo y las filas con fallos
+    no superan max_failing_row_rate (el conjunto original tiene, p. ej.,
+    alguna tarifa negativa).
+
+    reconcile compara origen y destino con un hash por fila calculado por
+    bloques: solo se guardan los hashes (8 bytes por fila) y no ambos
+    conjuntos de datos, y se informa qué filas del origen no llegaron.
+    """
+    # Columna -> tipo esperado ('numeric', 'text' o 'date', que acepta texto)
+    EXPECTED_COLUMNS = {
+        'hotel': 'text', 'is_canceled': 'numeric', 'lead_time': 'numeric',
+        'arrival_date_year': 'numeric', 'arrival_date_month': 'text',
+        'arrival_date_week_number': 'numeric', 'arrival_date_day_of_month': 'numeric',
+        'stays_in_weekend_nights': 'numeric', 'stays_in_week_nights': 'numeric',
+        'adults': 'numeric', 'children': 'numeric', 'babies': 'numeric', 'meal': 'text',
+        'country': 'text', 'market_segment': 'text', 'distribution_channel': 'text',
+        'is_repeated_guest': 'numeric', 'previous_cancellations': 'numeric',
+        'previous_bookings_not_canceled': 'numeric', 'reserved_room_type': 'text',
+        'assigned_room_type': 'text', 'booking_changes': 'numeric', 'deposit_type': 'text',
+        'agent': 'numeric', 'company': 'numeric', 'days_in_waiting_list': 'numeric',
+        'customer_type': 'text', 'adr': 'numeric', 'required_car_parking_spaces': 'numeric',
+        'total_of_special_requests': 'numeric', 'reservation_status': 'text',
+        'reservation_status_date': 'date'
+    }
+    # Columna -> (mínimo, máximo) inclusivos; None = sin límite
+    RANGES = {
+        'lead_time': (0, None), 'arrival_date_year': (2000, 2100),
+        'arrival_date_week_number': (1, 53), 'arrival_date_day_of_month': (1, 31),
+        'stays_in_weekend_nights': (0, None), 'stays_in_week_nights': (0, None),
+        'adults': (0, None), 'children': (0, None), 'babies': (0, None),
+        'previous_cancellations': (0, None), 'previous_bookings_not_canceled': (0, None),
+        'booking_changes': (0, None), 'days_in_waiting_list': (0, None), 'adr': (0, None),
+        'required_car_parking_spaces': (0, None), 'total_of_special_requests': (0, None)
+    }
+    ALLOWED_VALUES = {
+        'hotel': ['City Hotel', 'Resort Hotel'],
+        'arrival_date_month': DerivedColumnEngine.MONTHS,
+        'is_canceled': [0, 1], 'is_repeated_guest': [0, 1]
+    }
+    MAX_NULL_RATE = 0.05
+    # agent y company vienen vacías en la mayoría de reservas
+    NULL_RATE_LIMITS = {'agent': 0.5, 'company': 1.0}
+
+    def __init__(self, expected_rows=None, chunksize=100_000, max_workers=None,
+                 max_failing_row_rate=0.01, max_reported_rows=1000):
+        self.expected_rows = expected_rows
+        self.chunksize = chunksize
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_failing_row_rate = max_failing_row_rate
+        self.max_reported_rows = max_reported_rows
+
+    # --- Lectura por bloques -------------------------------------------------
+
+    def iter_chunks(self, source):
+        """Bloques de un DataFrame (vistas) o de un archivo sin cargarlo completo"""
+        if isinstance(source, pd.DataFrame):
+            for start in range(0, len(source), self.chunksize):
+                yield source.iloc[start:start + self.chunksize]
+            return
+
+        name = source.lower()
+        if name.endswith(('.csv', '.csv.gz', '.txt')):
+            yield from pd.read_csv(source, chunksize=self.chunksize)
+        elif name.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=self.chunksize):
+                yield batch.to_pandas()
+        elif name.endswith(('.arrow', '.feather')):
+            table = ArrowDataLoader(source).load_table()
+            for start in range(0, table.num_rows, self.chunksize):
+                yield table.slice(start, self.chunksize).to_pandas()
+        elif name.endswith(('.xlsx', '.xlsm', '.xls')):
+            yield from ExcelEngine(batch_size=self.chunksize).iter_batches(source)
+        else:
+            yield from JSONDataLoader(source, batch_size=self.chunksize).iter_batches()
+
+    def _map_chunks(self, func, chunks):
+        """Aplica func(bloque, desplazamiento) en paralelo, en orden y con ventana acotada"""
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = collections.deque()
+            offset = 0
+            for chunk in chunks:
+                pending.append(executor.submit(func, chunk, offset))
+                offset += len(chunk)
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    # --- Validación ----------------------------------------------------------
+
+    @staticmethod
+    def _kind(series):
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            return 'date'
+        if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            return 'numeric'
+        return 'text'
+
+    def check_chunk(self, chunk, offset=0):
+        """Resultados parciales de un bloque: nulos, tipos y filas con fallos"""
+        failures = []
+        for col, (low, high) in self.RANGES.items():
+            if col not in chunk.columns or not pd.api.types.is_numeric_dtype(chunk[col].dtype):
+                continue
+            values = chunk[col]
+            bad = pd.Series(False, index=chunk.index)
+            if low is not None:
+                bad |= values < low
+            if high is not None:
+                bad |= values > high
+            if bad.any():
+                failures.append(pd.DataFrame({'row': np.flatnonzero(bad.to_numpy()) + offset, 'column': col,
+                                              'check': 'rango', 'value': values[bad].astype(str).to_numpy()}))
+
+        for col, allowed in self.ALLOWED_VALUES.items():
+            if col not in chunk.columns:
+                continue
+            values = chunk[col]
+            bad = values.notna() & ~values.isin(allowed)
+            if bad.any():
+                failures.append(pd.DataFrame({'row': np.flatnonzero(bad.to_numpy()) + offset, 'column': col,
+                                              'check': 'valor no permitido', 'value': values[bad].astype(str).to_numpy()}))
+
+        kinds = {col: self._kind(chunk[col]) for col in chunk.columns if chunk[col].notna().any()}
+        return {
+            'rows': len(chunk),
+            'columns': list(chunk.columns),
+            'nulls': chunk.isna().sum(),
+            'kinds': kinds,
+            'failures': pd.concat(failures, ignore_index=True) if failures else None
+        }
+
+    def validate(self, data):
+        """Valida un DataFrame ya cargado"""
+        return self._summarize(self._map_chunks(self.check_chunk, self.iter_chunks(data)))
+
+    def validate_source(self, path):
+        """Valida un archivo mientras se lee por bloques"""
+        return self._summarize(self._map_chunks(self.check_chunk, self.iter_chunks(path)))
+
+    def _summarize(self, partials):
+        rows = 0
+        columns = None
+        nulls = None
+        kinds = {}
+        failures = []
+        failing_values = 0
+        for partial in partials:
+            rows += partial['rows']
+            columns = columns or partial['columns']
+            nulls = partial['nulls'] if nulls is None else nulls.add(partial['nulls'], fill_value=0)
+            for col, kind in partial['kinds'].items():
+                # Una columna con texto en algún bloque es de texto
+                kinds[col] = 'text' if 'text' in (kind, kinds.get(col)) else kind
+            if partial['failures'] is not None:
+                failing_values += len(partial['failures'])
+                failures.append(partial['failures'])
+        columns = columns or []
+
+        missing = [col for col in self.EXPECTED_COLUMNS if col not in columns]
+        type_mismatch = {
+            col: kinds[col] for col, expected in self.EXPECTED_COLUMNS.items()
+            if col in kinds and kinds[col] != expected and not (expected == 'date' and kinds[col] == 'text')
+        }
+        null_rates = (nulls / rows).round(6).to_dict() if rows else {}
+        null_failures = {
+            col: rate for col, rate in null_rates.items()
+            if rate > self.NULL_RATE_LIMITS.get(col, self.MAX_NULL_RATE)
+        }
+
+        failures = pd.concat(failures, ignore_index=True) if failures else pd.DataFrame(columns=['row', 'column', 'check', 'value'])
+        failing_rows = failures['row'].nunique()
+        row_count_ok = self.expected_rows is None or rows == self.expected_rows
+        passed = (not missing and not type_mismatch and not null_failures and row_count_ok
+                  and failing_rows <= self.max_failing_row_rate * max(rows, 1))
+
+        return {
+            'passed': bool(passed),
+            'rows': int(rows),
+            'expected_rows': self.expected_rows,
+            'schema': {
+                'missing': missing,
+                'unexpected': [col for col in columns if col not in self.EXPECTED_COLUMNS],
+                'type_mismatch': type_mismatch
+            },
+            'null_rates': null_rates,
+            'null_rate_failures': null_failures,
+            'failing_rows': int(failing_rows),
+            'failing_values': int(failing_values),
+            'failures_by_check': failures.groupby(['column', 'check']).size().rename('rows').reset_index().to_dict('records'),
+            'failing_rows_sample': failures.sort_values('row').head(self.max_reported_rows).to_dict('records')
+        }
+
+    # --- Conciliación ----------------------------------------------------------
+
+    @staticmethod
+    def _normalize(chunk, kinds):
+        """Columnas llevadas al tipo del origen para que el hash no dependa del formato"""
+        normalized = {}
+        for col, kind in kinds.items():
+            series = chunk[col] if col in chunk.columns else pd.Series(np.nan, index=chunk.index)
+            if kind == 'date':
+                if pd.api.types.is_numeric_dtype(series.dtype):
+                    # JSON guarda las fechas como milisegundos desde 1970
+                    series = pd.to_datetime(series, unit='ms', errors='coerce')
+                else:
+                    # Mismo criterio que la limpieza (día antes que mes)
+                    series = DateParser().parse(series, col)
+                normalized[col] = series.to_numpy(dtype='datetime64[ns]').view('int64')
+            elif kind == 'numeric':
+                normalized[col] = pd.to_numeric(series, errors='coerce').astype('float64').round(9)
+            else:
+                normalized[col] = series.astype(object).where(series.notna(), '\x00').astype(str)
+        return pd.DataFrame(normalized, index=chunk.index)
+
+    def _hash_chunk(self, chunk, offset, kinds):
+        hashes = pd.util.hash_pandas_object(self._normalize(chunk, kinds), index=False).to_numpy()
+        # Huella del bloque: suma de sus hashes (no depende del orden de las filas)
+        return hashes, int(hashes.sum(dtype=np.uint64))
+
+    def _hash_source(self, source, kinds=None, columns=None):
+        chunks = self.iter_chunks(source)
+        first = next(chunks, None)
+        if first is None:
+            return kinds or {}, np.array([], dtype=np.uint64), []
+        if kinds is None:
+            # Las fechas conocidas se comparan como fecha aunque el origen (p. ej. un CSV) las tenga como texto
+            kinds = {col: 'date' if self.EXPECTED_COLUMNS.get(col) == 'date' else self._kind(first[col])
+                     for col in first.columns if columns is None or col in columns}
+
+        def all_chunks():
+            yield first
+            yield from chunks
+
+        results = list(self._map_chunks(lambda chunk, offset: self._hash_chunk(chunk, offset, kinds), all_chunks()))
+        hashes = np.concatenate([result[0] for result in results])
+        return kinds, hashes, [result[1] for result in results]
+
+    def reconcile(self, source, sink, columns=None):
+        """Compara origen y destino (DataFrames o rutas) fila a fila por hash
+
+        Los tipos se toman del origen (las columnas de fecha conocidas en
+        EXPECTED_COLUMNS siempre como fecha); columns limita la comparación.
+        Devuelve conteos, bloques que difieren y las filas del origen (por
+        posición) que no aparecen en el destino.
+        """
+        kinds, source_hashes, source_chunks = self._hash_source(source, columns=columns)
+        _, sink_hashes, sink_chunks = self._hash_source(sink, kinds)
+
+        source_counts = pd.Series(source_hashes).value_counts()
+        sink_counts = pd.Series(sink_hashes).value_counts()
+        difference = source_counts.sub(sink_counts, fill_value=0)
+        missing_hashes = difference.index[difference > 0].to_numpy(dtype=np.uint64)
+        missing_rows = np.flatnonzero(np.isin(source_hashes, missing_hashes))
+
+        return {
+            'passed': bool(len(source_hashes) == len(sink_hashes) and (difference == 0).all()),
+            'source_rows': int(len(source_hashes)),
+            'sink_rows': int(len(sink_hashes)),
+            'columns': list(kinds),
+            'missing_in_sink': int(difference[difference > 0].sum()),
+            'extra_in_sink': int(-difference[difference < 0].sum()),
+            'chunks_differ': [i for i, (a, b) in enumerate(zip(source_chunks, sink_chunks)) if a != b]
+                             + list(range(min(len(source_chunks), len(sink_chunks)), max(len(source_chunks), len(sink_chunks)))),
+            'failing_rows_sample': missing_rows[:self.max_reported_rows].tolist()
+        }
+
+    @staticmethod
+    def print_report(report, title):
+        status = 'OK' if report['passed'] else 'FALLÓ'
+        print(f"\n{title}: {status}")
+        if 'schema' in report:
+            print(f"  Filas: {report['rows']}" + (f" (esperadas {report['expected_rows']})" if report['expected_rows'] is not None else ""))
+            if report['schema']['missing']:
+                print(f"  Columnas faltantes: {', '.join(report['schema']['missing'])}")
+            for col, kind in report['schema']['type_mismatch'].items():
+                print(f"  Tipo incorrecto en {col}: {kind}")
+            for col, rate in report['null_rate_failures'].items():
+                print(f"  Demasiados nulos en {col}: {rate:.1%}")
+            for item in report['failures_by_check']:
+                print(f"  {item['column']} ({item['check']}): {item['rows']} filas")
+        else:
+            print(f"  Filas: {report['source_rows']} en origen, {report['sink_rows']} en destino")
+            print(f"  Faltan en destino: {report['missing_in_sink']}, sobran: {report['extra_in_sink']}")
+            if report['chunks_differ']:
+                print(f"  Bloques con diferencias: {report['chunks_differ'][:20]}")
+
+    @staticmethod
+    def save_report(report, path):
+        """Guarda el reporte en JSON"""
+        write_json_state(path, json.loads(json.dumps(report, default=str)))
 
 class HotelBookingAnalysis:
     """Clase principal del sistema de análisis"""
-    def __init__(self):
+    def __init__(self, workers=1, optimize_dtypes=False, cache=None, validate=False):
         self.data = None
         self.clean_data = None
+        # PipelineCache opcional; si hay acierto se omiten carga y limpieza
+        self.cache = cache
+        # Pasos de limpieza ya aplicados a self.data (> 0 si vienen de la caché)
+        self.cached_steps = 0
+        # Número de procesos para la limpieza (1 = DataCleaner en serie)
+        self.workers = workers
+        # Convertir a category / enteros pequeños antes de limpiar
+        self.optimize_dtypes = optimize_dtypes
+        # Archivo desde el que se cargaron los datos (None para PostgreSQL)
+        self.source_path = None
+        # Validar los datos cargados y conciliar los archivos guardados (DataValidator)
+        self.validate = validate
 
 
 
 
         # Rutas precargadas por defecto
         self.default_paths = {
-            'csv': 'C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\Data\\hotel_bookings.csv',
-            'excel': 'C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\Data\\hotel_bookings.xlsx',
-            'json': 'C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\Data\\hotel_bookings.json'
+            'csv': os.path.join(entradan, 'hotel_bookings.csv'),
+            'excel': os.path.join(entradan, 'hotel_bookings.xlsx'),
+            'json': os.path.join(entradan, 'hotel_bookings.json'),
+            'parquet': os.path.join(entradan, 'hotel_bookings.parquet'),
+            'arrow': os.path.join(entradan, 'hotel_bookings.arrow')
         }
 
 
@@ -281,10 +3033,27 @@ class HotelBookingAnalysis:
             print("No se pudo cargar ningún conjunto de datos. Saliendo...")
             return
 
+        if self.validate and not self.cached_steps and not self._validation_gate():
+            print("Validación no superada. Saliendo...")
+            return
+
+        if self.optimize_dtypes and not self.cached_steps:
+            print("\nOptimizando tipos de datos...")
+            self.data = DtypeOptimizer().optimize(self.data)
+
         # Limpiar y transformar datos
         print("\nRealizando limpieza y transformación de datos...")
-        cleaner = DataCleaner(self.data)
-        self.clean_data = cleaner.clean_data()
+        if self.cached_steps == len(PipelineCache.STEPS):
+            # Datos ya limpios (caché completa o carga y limpieza de varios archivos)
+            self.clean_data = self.data
+        elif self.cache is not None and self.source_path:
+            self.clean_data = self.cache.clean(self.data, self.source_path, self._cache_variant(), self.cached_steps)
+        else:
+            if self.workers > 1:
+                cleaner = ParallelDataCleaner(self.data, workers=self.workers)
+            else:
+                cleaner = DataCleaner(self.data, source_path=self.source_path)
+            self.clean_data = cleaner.clean_data()
 
         if self.clean_data is None:
             print("Error durante la limpieza de datos. Saliendo...")
@@ -299,12 +3068,46 @@ class HotelBookingAnalysis:
         # Guardar datos
         self._save_data()
 
+    def _validation_gate(self):
+        """Valida los datos cargados; devuelve False si no pasan y no se quiere continuar
+
+        Se revisa self.data por bloques en memoria, sin volver a leer el
+        archivo de origen (releer un Excel duplicaría la carga más lenta).
+        """
+        report = DataValidator().validate(self.data)
+        DataValidator.print_report(report, "Validación de datos")
+        DataValidator.save_report(report, os.path.join(salidan, 'validation_report.json'))
+
+        rows = sorted({item['row'] for item in report['failing_rows_sample']})
+        if rows:
+            failing_path = os.path.join(salidan, 'validation_failing_rows.csv')
+            self.data.iloc[rows].to_csv(failing_path, index_label='row')
+            print(f"  Filas con fallos (muestra) en {failing_path}")
+
+        if report['passed']:
+            return True
+        return input("¿Continuar de todos modos? (s/n): ").lower() == 's'
+
+    def _reconcile_sink(self, file_path):
+        """Compara los datos limpios con el archivo guardado"""
+        if not self.validate or not os.path.isfile(file_path):
+            return
+        report = DataValidator().reconcile(self.clean_data, file_path)
+        DataValidator.print_report(report, f"Conciliación con {file_path}")
+        # Un reporte por archivo: la opción de varios formatos concilia varios destinos
+        report_name = f"reconciliation_report_{os.path.basename(os.path.normpath(file_path))}.json"
+        DataValidator.save_report(report, os.path.join(salidan, report_name))
+
+    def _cache_variant(self):
+        """Variante de la clave de caché según las opciones que cambian el resultado"""
+        return 'optimize_dtypes' if self.optimize_dtypes else 'default'
+
     def _load_data_auto(self):
         """Intenta cargar automáticamente de las rutas precargadas"""
         print("\nIntentando carga automática desde rutas precargadas...")
 
-        # Orden de intentos de carga
-        formats_to_try = ['csv', 'excel', 'json']
+        # Orden de intentos de carga (primero los formatos columnares, más rápidos)
+        formats_to_try = ['arrow', 'parquet', 'csv', 'excel', 'json']
 
         for file_format in formats_to_try:
             file_path = self.default_paths[file_format]
@@ -316,10 +3119,23 @@ class HotelBookingAnalysis:
                 loader = ExcelDataLoader(file_path)
             elif file_format == 'json':
                 loader = JSONDataLoader(file_path)
+            elif file_format == 'parquet':
+                loader = ParquetDataLoader(file_path)
+            elif file_format == 'arrow':
+                loader = ArrowDataLoader(file_path)
+
+            if self.cache is not None and os.path.isfile(file_path):
+                self.cached_steps, cached = self.cache.lookup(file_path, self._cache_variant())
+                if cached is not None:
+                    self.data = cached
+                    self.source_path = file_path
+                    print(f"¡Éxito! Datos recuperados de la caché para {file_path}")
+                    return True
 
             self.data = loader.load_data()
 
             if self.data is not None:
+                self.source_path = file_path
                 print(f"¡Éxito! Datos cargados desde {file_path}")
                 return True
 
@@ -331,29 +3147,36 @@ class HotelBookingAnalysis:
         print("\nOpciones para cargar datos:")
         print("1. Desde archivo CSV")
         print("2. Desde archivo Excel")
-        print("3. Desde archivo JSON")
+        print("3. Desde archivo JSON / NDJSON")
         print("4. Desde PostgreSQL - Prueba aun no charcha")
         print("5. Salir")
+        print("6. Desde archivo Parquet")
+        print("7. Desde archivo Arrow/Feather")
+        print("8. Desde varios archivos (patrón glob o carpeta)")
+        print("9. Desde el dataset particionado (año/mes/hotel)")
 
-        option = input("\nSeleccione una opción (1-5): ")
+        option = input("\nSeleccione una opción (1-9): ")
 
         if option == '1':
             file_path = input(f"Ingrese la ruta del archivo CSV (dejar en blanco para '{self.default_paths['csv']}'): ")
             file_path = file_path if file_path else self.default_paths['csv']
             loader = CSVDataLoader(file_path)
             self.data = loader.load_data()
+            self.source_path = file_path
 
         elif option == '2':
             file_path = input(f"Ingrese la ruta del archivo Excel (dejar en blanco para '{self.default_paths['excel']}'): ")
             file_path = file_path if file_path else self.default_paths['excel']
             loader = ExcelDataLoader(file_path)
             self.data = loader.load_data()
+            self.source_path = file_path
 
         elif option == '3':
             file_path = input(f"Ingrese la ruta del archivo JSON (dejar en blanco para '{self.default_paths['json']}'): ")
             file_path = file_path if file_path else self.default_paths['json']
             loader = JSONDataLoader(file_path)
             self.data = loader.load_data()
+            self.source_path = file_path
 
         elif option == '4':
             print("\nIngrese los parámetros de conexión a PostgreSQL:")
@@ -371,6 +3194,46 @@ class HotelBookingAnalysis:
             print("Saliendo...")
             sys.exit()
 
+        elif option == '6':
+            file_path = input(f"Ingrese la ruta del archivo Parquet (dejar en blanco para '{self.default_paths['parquet']}'): ")
+            file_path = file_path if file_path else self.default_paths['parquet']
+            loader = ParquetDataLoader(file_path)
+            self.data = loader.load_data()
+            self.source_path = file_path
+
+        elif option == '7':
+            file_path = input(f"Ingrese la ruta del archivo Arrow (dejar en blanco para '{self.default_paths['arrow']}'): ")
+            file_path = file_path if file_path else self.default_paths['arrow']
+            loader = ArrowDataLoader(file_path)
+            self.data = loader.load_data()
+            self.source_path = file_path
+
+        elif option == '8':
+            pattern = input("Ingrese el patrón o carpeta (p. ej. datos/hotel_bookings_*.csv): ")
+            loader = MultiFileDataLoader(pattern, max_workers=self.workers if self.workers > 1 else None)
+            if self.validate or self.optimize_dtypes:
+                # La validación y la optimización de tipos necesitan los datos sin limpiar
+                self.data = loader.load_data()
+            else:
+                # Las fechas de cada archivo se convierten mientras se cargan los demás
+                self.data = loader.load_and_clean()
+                self.cached_steps = len(PipelineCache.STEPS)
+
+        elif option == '9':
+            default_root = os.path.join(salidan, 'hotel_bookings_warehouse')
+            root = input(f"Ingrese la carpeta del dataset (dejar en blanco para '{default_root}'): ") or default_root
+            filters = []
+            year = input("Año de llegada (dejar en blanco para todos): ")
+            if year:
+                filters.append(('arrival_date_year', '=', int(year)))
+            month = input("Mes de llegada en inglés, p. ej. August (dejar en blanco para todos): ")
+            if month:
+                filters.append(('arrival_date_month', '=', month))
+            hotel = input("Hotel, p. ej. Resort Hotel (dejar en blanco para todos): ")
+            if hotel:
+                filters.append(('hotel', '=', hotel))
+            self.data = PartitionedDataLoader(root, filters).load_data()
+
         else:
             print("Opción no válida. Intente nuevamente.")
             self._load_data_interactive()
@@ -383,11 +3246,23 @@ class HotelBookingAnalysis:
         print("3. Guardar como JSON")
         print("4. Guardar en PostgreSQL - (Prueba xD - aun no jala uwu)")
         print("5. No guardar y salir")
-
-        option = input("\nSeleccione una opción (1-5): ")
-
-        if option in ['1', '2', '3']:
-            default_name = f"hotel_bookings_clean.{'csv' if option == '1' else 'xlsx' if option == '2' else 'json'}"
+        print("6. Guardar como Parquet")
+        print("7. Guardar como Arrow/Feather")
+        print("8. Guardar como NDJSON (una línea por registro, .gz para comprimir)")
+        print("9. Guardar como dataset particionado por año/mes/hotel (almacén)")
+        print("10. Guardar como esquema en estrella (dimensiones y hechos)")
+        print("11. Guardar en varios formatos a la vez (p. ej. 1,6,7)")
+
+        option = input("\nSeleccione una opción (1-11): ")
+
+        extensions = {'1': 'csv', '2': 'xlsx', '3': 'json', '6': 'parquet', '7': 'arrow', '8': 'ndjson'}
+        default_names = {opt: f"hotel_bookings_clean.{ext}" for opt, ext in extensions.items()}
+        default_names['9'] = 'hotel_bookings_warehouse'
+        default_names['10'] = 'star_schema'
+        star_to_postgres = option == '10' and input("¿Cargar el esquema en PostgreSQL? (s/n): ").lower() == 's'
+
+        if option in default_names and not star_to_postgres:
+            default_name = default_names[option]
             custom_path = input(f"Ingrese SOLO el nombre del archivo (dejar en blanco para '{default_name}'): ")
             
             if custom_path:
@@ -396,6 +3271,8 @@ class HotelBookingAnalysis:
                 file_path = os.path.join(salidan, default_name)
                 
             success = DataSaver.save_data(self.clean_data, option, file_path)
+            if success:
+                self._reconcile_sink(file_path)
 
             if not success:
                 print("¿Desea intentar con otra opción? (s/n)")
@@ -403,15 +3280,8 @@ class HotelBookingAnalysis:
                 if retry == 's':
                     self._save_data()
 
-        elif option == '4':
-            print("\nIngrese los parámetros de conexión a PostgreSQL:")
-            db_config = {
-                'dbname': input("Nombre de la base de datos: "),
-                'user': input("Usuario: "),
-                'password': input("Contraseña: "),
-                'host': input("Host (dejar en blanco para localhost): ") or "localhost",
-                'port': input("Puerto (dejar en blanco para 5432): ") or "5432"
-            }
+        elif option == '4' or star_to_postgres:
+            db_config = self._ask_db_config()
 
             success = DataSaver.save_data(self.clean_data, option, db_config=db_config)
 
@@ -421,16 +3291,298 @@ class HotelBookingAnalysis:
                 if retry == 's':
                     self._save_data()
 
+        elif option == '11':
+            selected = [opt.strip() for opt in input("Opciones separadas por comas (1-4, 6-10): ").split(',') if opt.strip()]
+            sinks = []
+            for opt in selected:
+                if opt in default_names:
+                    sinks.append({'option': opt, 'file_path': os.path.join(salidan, default_names[opt])})
+                elif opt == '4':
+                    sinks.append({'option': opt, 'db_config': self._ask_db_config()})
+                else:
+                    print(f"Opción {opt} no válida, se omite.")
+
+            print("\nGuardando en paralelo...")
+            results = DataSaver.save_many(self.clean_data, sinks)
+            for result in results:
+                if result['success']:
+                    self._reconcile_sink(result['sink'])
+
+            if not all(result['success'] for result in results):
+                print("¿Desea intentar con otra opción? (s/n)")
+                retry = input().lower()
+                if retry == 's':
+                    self._save_data()
+
         elif option == '5':
             print("Saliendo sin guardar...")
         else:
             print("Opción no válida. Intente nuevamente.")
             self._save_data()
 
+    @staticmethod
+    def _ask_db_config():
+        """Pide los parámetros de conexión a PostgreSQL"""
+        print("\nIngrese los parámetros de conexión a PostgreSQL:")
+        return {
+            'dbname': input("Nombre de la base de datos: "),
+            'user': input("Usuario: "),
+            'password': input("Contraseña: "),
+            'host': input("Host (dejar en blanco para localhost): ") or "localhost",
+            'port': input("Puerto (dejar en blanco para 5432): ") or "5432"
+        }
+
+class BatchJobRunner:
+    """Ejecución sin interacción de trabajos definidos en un archivo TOML o YAML
+
+    Cada trabajo tiene un origen, una lista de transformaciones y una lista
+    de destinos; los trabajos se ejecutan a la vez en un ThreadPoolExecutor
+    de max_workers hilos. Ejemplo (TOML):
+
+        [defaults]
+        output_dir = "output"
+        max_workers = 4
+
+        [[jobs]]
+        name = "resort"
+        source = { type = "csv", path = "data/resort.csv" }
+        transforms = ["optimize_dtypes", "clean"]
+        sinks = [{ type = "parquet", path = "resort_clean.parquet" }]
+
+    Tipos de origen: csv, excel, json, parquet, arrow, glob (patrón o carpeta),
+    partitioned (con filters opcional, p. ej. [["hotel", "=", "Resort Hotel"]]),
+    postgres (con dbname, user, password, host, port, table_name).
+    Transformaciones: optimize_dtypes, clean.
+    columns (opcional) limita la salida a esas columnas; con transforms =
+    ["clean"] se usa LazyPipeline y solo se leen y limpian las necesarias.
+    validate = true (opcional) detiene el trabajo si DataValidator no aprueba
+    los datos cargados.
+    mode = "stream" (opcional) limpia un origen csv hacia un único destino csv
+    por bloques de chunksize filas (StreamingETL), sin cargar el archivo entero.
+    Destinos: csv, excel, json, ndjson, parquet, arrow, partitioned, postgres (con db_config),
+    star_schema (carpeta con un Parquet por tabla, o PostgreSQL con db_config).
+    Las rutas relativas se resuelven desde base_dir (la carpeta del archivo
+    de trabajos); las de los destinos, desde output_dir.
+    """
+    LOADERS = {'csv': CSVDataLoader, 'excel': ExcelDataLoader, 'json': JSONDataLoader,
+               'parquet': ParquetDataLoader, 'arrow': ArrowDataLoader, 'glob': MultiFileDataLoader,
+               'partitioned': PartitionedDataLoader}
+    SAVE_OPTIONS = {'csv': '1', 'excel': '2', 'json': '3', 'postgres': '4',
+                    'parquet': '6', 'arrow': '7', 'ndjson': '8', 'partitioned': '9',
+                    'star_schema': '10'}
+
+    def __init__(self, config, base_dir='.'):
+        defaults = config.get('defaults', {})
+        self.jobs = config.get('jobs', [])
+        self.base_dir = base_dir
+        self.output_dir = os.path.join(base_dir, defaults.get('output_dir', salidan))
+        self.max_workers = defaults.get('max_workers', os.cpu_count() or 1)
+        self.summary_path = defaults.get('summary', os.path.join(self.output_dir, 'job_summary.json'))
+        self._print_lock = threading.Lock()
+
+    @staticmethod
+    def load_config(path):
+        """Lee el archivo de trabajos (.toml, o .yaml/.yml con PyYAML)"""
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            with open(path, 'r', encoding='utf-8') as file:
+                return yaml.safe_load(file) or {}
+
+        import tomllib
+        with open(path, 'rb') as file:
+            return tomllib.load(file)
+
+    def _log(self, job_name, message):
+        with self._print_lock:
+            print(f"[{job_name}] {message}")
+
+    def _loader(self, source):
+        source_type = source.get('type', 'csv')
+        if source_type == 'postgres':
+            params = {key: source[key] for key in ['dbname', 'user', 'password', 'host', 'port', 'table_name']}
+            return PostgreSQLDataLoader(**params)
+        if source_type == 'partitioned':
+            filters = [tuple(f) for f in source.get('filters', [])]
+            return PartitionedDataLoader(os.path.join(self.base_dir, source['path']), filters)
+        return self.LOADERS[source_type](os.path.join(self.base_dir, source['path']))
+
+    def _run_stream(self, job, summary):
+        """Trabajo con mode = "stream": CSV -> limpieza por bloques -> CSV"""
+        source, sinks = job['source'], job.get('sinks', [])
+        if source.get('type', 'csv') != 'csv' or len(sinks) != 1 or sinks[0].get('type') != 'csv':
+            raise ValueError('mode = "stream" requiere un origen csv y un único destino csv')
+        file_path = DataSaver._resolve_path(os.path.join(self.output_dir, sinks[0]['path']), 'csv')
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+
+        sink_start = time.perf_counter()
+        rows = StreamingETL(os.path.join(self.base_dir, source['path']), file_path,
+                            chunksize=job.get('chunksize', 100_000)).run()
+        if rows is None:
+            raise ValueError("error durante el streaming")
+        summary['rows'] = rows
+        summary['sinks'] = {file_path: round(time.perf_counter() - sink_start, 4)}
+
+    def run_job(self, job):
+        """Ejecuta un trabajo y devuelve su resumen (nunca lanza excepciones)"""
+        name = job.get('name', job.get('source', {}).get('path', 'job'))
+        summary = {'job': name, 'status': 'ok', 'rows': 0, 'sinks': {}}
+        start = time.perf_counter()
+        try:
+            if job.get('mode') == 'stream':
+                self._run_stream(job, summary)
+                return self._finish(name, summary, start)
+
+            source = job['source']
+            source_path = os.path.join(self.base_dir, source['path']) if 'path' in source else None
+            transforms = job.get('transforms', ['clean'])
+            columns = job.get('columns')
+            if columns is not None and transforms == ['clean'] and not job.get('validate'):
+                # Carga y limpieza planificadas: solo se leen y procesan las columnas necesarias
+                data = LazyPipeline(self._loader(source), columns, source_path).collect()
+                if data is None:
+                    raise ValueError("no se pudieron cargar o limpiar los datos")
+                transforms = []
+            elif source.get('type') == 'glob' and transforms == ['clean'] and not job.get('validate'):
+                # Las fechas de cada archivo se convierten mientras se cargan los demás
+                data = self._loader(source).load_and_clean(source_path)
+                if data is None:
+                    raise ValueError("no se pudieron cargar o limpiar los datos")
+                transforms = []
+            else:
+                data = self._loader(source).load_data()
+                if data is None:
+                    raise ValueError("no se pudieron cargar los datos")
+                if job.get('validate'):
+                    report = DataValidator().validate(data)
+                    summary['validation'] = {key: report[key] for key in ['passed', 'rows', 'failing_rows', 'null_rate_failures']}
+                    if not report['passed']:
+                        raise ValueError("la validación de datos no se superó")
+            summary['load_s'] = round(time.perf_counter() - start, 4)
+
+            for transform in transforms:
+                if transform == 'optimize_dtypes':
+                    data = DtypeOptimizer().optimize(data)
+                elif transform == 'clean':
+                    data = DataCleaner(data, source_path=source_path).clean_data()
+                    if data is None:
+                        raise ValueError("error durante la limpieza")
+                else:
+                    raise ValueError(f"transformación desconocida: {transform}")
+            if columns is not None:
+                data = data[[col for col in columns if col in data.columns]]
+            summary['rows'] = len(data)
+
+            sinks = []
+            for sink in job.get('sinks', []):
+                file_path = sink.get('path')
+                if file_path and not os.path.isabs(file_path):
+                    file_path = os.path.join(self.output_dir, file_path)
+                sinks.append({'option': self.SAVE_OPTIONS[sink['type']], 'file_path': file_path,
+                              'db_config': sink.get('db_config')})
+
+            # Todos los destinos del trabajo se escriben a la vez
+            results = DataSaver.save_many(data, sinks) if sinks else []
+            summary['sinks'] = {result['sink']: result['seconds'] for result in results}
+            failed = [result['sink'] for result in results if not result['success']]
+            if failed:
+                raise ValueError(f"no se pudo guardar en {', '.join(failed)}")
+        except Exception as e:
+            summary['status'] = 'error'
+            summary['error'] = str(e)
+        return self._finish(name, summary, start)
+
+    def _finish(self, name, summary, start):
+        """Completa el resumen de un trabajo con sus tiempos y lo informa"""
+        elapsed = time.perf_counter() - start
+        summary['wall_s'] = round(elapsed, 4)
+        summary['rows_per_s'] = round(summary['rows'] / elapsed, 1) if elapsed > 0 else None
+        self._log(name, f"{summary['status']}: {summary['rows']} filas en {elapsed:.2f} s"
+                        + (f" ({summary['error']})" if 'error' in summary else ""))
+        return summary
+
+    def run(self):
+        """Ejecuta todos los trabajos y escribe el resumen de rendimiento"""
+        start = time.perf_counter()
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.run_job, job) for job in self.jobs]
+            for future in as_completed(futures):
+                results.append(future.result())
+
+        elapsed = time.perf_counter() - start
+        total_rows = sum(result['rows'] for result in results)
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'wall_s': round(elapsed, 4),
+            'rows': total_rows,
+            'rows_per_s': round(total_rows / elapsed, 1) if elapsed > 0 else None,
+            'jobs': sorted(results, key=lambda result: result['job'])
+        }
+        write_json_state(self.summary_path, report)
+
+        print(f"\n{'Trabajo':<30} {'Estado':<7} {'Filas':>10} {'Tiempo (s)':>11} {'Filas/s':>12}")
+        for result in report['jobs']:
+            print(f"{result['job']:<30} {result['status']:<7} {result['rows']:>10} "
+                  f"{result['wall_s']:>11.2f} {result['rows_per_s'] or 0:>12,.0f}")
+        print(f"\nTotal: {total_rows} filas en {elapsed:.2f} s. Resumen en {self.summary_path}")
+        return report
+
+
+
 #MAIN
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sistema de Análisis de Reservaciones Hoteleras")
+    parser.add_argument('--workers', type=int, default=1, help="Procesos para la limpieza en paralelo (por defecto 1)")
+    parser.add_argument('--optimize-dtypes', action='store_true', help="Usar category y enteros pequeños antes de limpiar")
+    parser.add_argument('--metrics', help="Archivo JSON-lines para los eventos de instrumentación")
+    parser.add_argument('--profile', help="Etapas a perfilar con cProfile/tracemalloc, separadas por comas "
+                                          "(p. ej. DataCleaner._convert_dates)")
+    parser.add_argument('--cache', action='store_true', help="Reutilizar resultados de carga y limpieza ya calculados")
+    parser.add_argument('--clear-cache', action='store_true', help="Vaciar la caché del pipeline antes de ejecutar")
+    parser.add_argument('--validate', action='store_true',
+                        help="Validar los datos cargados y conciliar los archivos guardados (reportes en salida)")
+    parser.add_argument('--incremental', metavar='CSV',
+                        help="Carga incremental del CSV en PostgreSQL (solo filas nuevas o modificadas)")
+    parser.add_argument('--table', default='hotel_bookings_incremental',
+                        help="Tabla destino de --incremental (por defecto hotel_bookings_incremental)")
+    parser.add_argument('--stream', nargs=2, metavar=('CSV', 'SALIDA'),
+                        help="Limpiar un CSV por bloques hacia otro CSV con memoria acotada")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="Filas por bloque de --stream (por defecto 100000)")
+    parser.add_argument('--job', help="Archivo de trabajos TOML/YAML para ejecutar sin interacción")
+    parser.add_argument('--max-workers', type=int, help="Trabajos simultáneos (sobrescribe el archivo de trabajos)")
+    args = parser.parse_args()
+
+    pipeline_cache = PipelineCache() if args.cache or args.clear_cache else None
+    if args.clear_cache:
+        pipeline_cache.invalidate()
+        print("Caché del pipeline vaciada.")
+
+    if args.metrics:
+        instrumentation.add_hook(JSONLinesHook(args.metrics))
+    if args.profile:
+        instrumentation.enable_profiling(args.profile.split(','))
+
     try:
-        analysis_system = HotelBookingAnalysis()
+        if args.incremental:
+            db_config = HotelBookingAnalysis._ask_db_config()
+            loaded = IncrementalETL(args.incremental, db_config, table_name=args.table).run()
+            sys.exit(0 if loaded is not None else 1)
+
+        if args.stream:
+            rows = StreamingETL(*args.stream, chunksize=args.chunksize).run()
+            sys.exit(0 if rows is not None else 1)
+
+        if args.job:
+            runner = BatchJobRunner(BatchJobRunner.load_config(args.job),
+                                    base_dir=os.path.dirname(os.path.abspath(args.job)))
+            if args.max_workers:
+                runner.max_workers = args.max_workers
+            report = runner.run()
+            sys.exit(0 if all(job['status'] == 'ok' for job in report['jobs']) else 1)
+
+        analysis_system = HotelBookingAnalysis(workers=args.workers, optimize_dtypes=args.optimize_dtypes,
+                                               cache=pipeline_cache if args.cache else None, validate=args.validate)
         analysis_system.run()
     except KeyboardInterrupt:
         print("\nOperación cancelada por el usuario.")
@@ -1,21 +1,29 @@
-import pandas as pd
+import os
 import sys
 
+# Permite importar hotel_main2 desde la raíz del proyecto
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from hotel_main2 import DataValidator, entradan
+
+# Comprueba que las copias Excel y JSON coinciden con el CSV original,
+# fila a fila y leyendo por bloques (sin cargar los archivos completos).
+# Uso: python comprobador.py [hotel_bookings.csv hotel_bookings.xlsx hotel_bookings.json]
+rutas = sys.argv[1:] or [os.path.join(entradan, nombre) for nombre in
+                         ['hotel_bookings.csv', 'hotel_bookings.xlsx', 'hotel_bookings.json']]
+
 try:
-    df_excel = pd.read_excel('C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\Data\\hotel_bookings.xlsx')
-    df_json = pd.read_json('C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\Data\\hotel_bookings.json')
-    
-    print("Excel - Columnas:", df_excel.columns.tolist())
-    print("JSON - Primer registro:", df_json.iloc[0].to_dict())
+    validator = DataValidator()
+    original = rutas[0]
+
+    reporte = validator.validate_source(original)
+    DataValidator.print_report(reporte, f"Validación de {original}")
 
     print("\n Comprobando...")
-    
-    df_csv = pd.read_csv('C:\\Users\\Wakeful\\Desktop\\ETL - Almacenes\\Data\\hotel_bookings.csv')
-    if df_csv.shape == df_excel.shape:
-        print("\n\n")
-        print("Excel y CSV tienen las mismas dimensiones.")
-    else:
-        print("Error: Tamaños no coinciden.")
-        
+    for copia in rutas[1:]:
+        conciliacion = validator.reconcile(original, copia)
+        DataValidator.print_report(conciliacion, f"{original} vs {copia}")
+        if conciliacion['failing_rows_sample']:
+            print(f"  Primeras filas distintas: {conciliacion['failing_rows_sample'][:10]}")
+
 except Exception as e:
-    print(f"Error al verificar: {e}")
\ No newline at end of file
+    print(f"Error al verificar: {e}")
@@ -0,0 +1,255 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Permite importar hotel_main2 desde la raíz del proyecto
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+import hotel_main2
+from hotel_main2 import (CSVDataLoader, ExcelDataLoader, JSONDataLoader, ParquetDataLoader,
+                         ArrowDataLoader, PostgreSQLDataLoader, DataCleaner, DataSaver, peak_rss_mb)
+
+# Benchmark del pipeline ETL por etapas: cada DataLoader.load_data, cada paso
+# privado de DataCleaner y cada formato de DataSaver. Guarda tiempo, pico de
+# RSS y filas/s en un JSON para comparar entre commits.
+#
+# Uso:
+#   python benchmark.py --rows 10000,1000000,10000000 --output resultados.json
+#   python benchmark.py --rows 10000 --compare resultados_anteriores.json
+#   python benchmark.py --rows 10000 --postgres   (usa PGDATABASE, PGUSER, PGHOST...)
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+# Excel no admite más de 1,048,576 filas por hoja
+EXCEL_MAX_ROWS = 1_048_575
+
+CLEANING_STEPS = ['_convert_dates', '_handle_nulls', '_create_new_columns', '_standardize_formats']
+
+SAVE_OPTIONS = {'csv': ('1', 'csv'), 'excel': ('2', 'xlsx'), 'json': ('3', 'json'),
+                'parquet': ('6', 'parquet'), 'arrow': ('7', 'arrow')}
+
+
+def generate_hotel_bookings(rows, seed=0):
+    """DataFrame sintético con el mismo esquema que hotel_bookings.csv"""
+    rng = np.random.default_rng(seed)
+    year = rng.integers(2015, 2018, rows)
+    month = rng.integers(1, 13, rows)
+    day = rng.integers(1, 29, rows)
+    weekend = rng.integers(0, 5, rows)
+    week = rng.integers(0, 11, rows)
+    arrival = pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': day}))
+    status_date = arrival + pd.to_timedelta(weekend + week, unit='D')
+
+    # Mezcla de formatos de fecha como en las exportaciones reales
+    status_text = np.where(rng.random(rows) < 0.8,
+                           status_date.dt.strftime('%d/%m/%Y'),
+                           status_date.dt.strftime('%Y-%m-%d'))
+
+    return pd.DataFrame({
+        'hotel': rng.choice(['Resort Hotel', 'City Hotel'], rows, p=[0.34, 0.66]),
+        'is_canceled': rng.integers(0, 2, rows),
+        'lead_time': rng.integers(0, 738, rows),
+        'arrival_date_year': year,
+        'arrival_date_month': np.array(MONTHS)[month - 1],
+        'arrival_date_week_number': arrival.dt.isocalendar().week.to_numpy(dtype='int64'),
+        'arrival_date_day_of_month': day,
+        'stays_in_weekend_nights': weekend,
+        'stays_in_week_nights': week,
+        'adults': rng.choice([1, 2, 3, 4], rows, p=[0.19, 0.75, 0.05, 0.01]),
+        'children': rng.choice([0, 1, 2, 3, np.nan], rows, p=[0.92, 0.04, 0.0389, 0.001, 0.0001]),
+        'babies': rng.choice([0, 1, 2], rows, p=[0.992, 0.0075, 0.0005]),
+        'meal': rng.choice(['BB', 'HB', 'SC', 'Undefined', 'FB'], rows, p=[0.77, 0.12, 0.09, 0.01, 0.01]),
+        'country': rng.choice(['PRT', 'GBR', 'FRA', 'ESP', 'DEU', 'ITA', 'irl', 'bel', None], rows,
+                              p=[0.40, 0.10, 0.09, 0.07, 0.06, 0.03, 0.03, 0.02, 0.20]),
+        'market_segment': rng.choice(['Online TA', 'Offline TA/TO', 'Groups', 'Direct', 'Corporate'], rows,
+                                     p=[0.47, 0.20, 0.17, 0.11, 0.05]),
+        'distribution_channel': rng.choice(['TA/TO', 'Direct', 'Corporate', 'GDS'], rows,
+                                           p=[0.82, 0.12, 0.055, 0.005]),
+        'is_repeated_guest': rng.choice([0, 1], rows, p=[0.97, 0.03]),
+        'previous_cancellations': rng.choice([0, 1, 2], rows, p=[0.94, 0.05, 0.01]),
+        'previous_bookings_not_canceled': rng.choice([0, 1, 2], rows, p=[0.97, 0.02, 0.01]),
+        'reserved_room_type': rng.choice(list('ADEFGB'), rows, p=[0.72, 0.16, 0.05, 0.03, 0.03, 0.01]),
+        'assigned_room_type': rng.choice(list('ADEFGB'), rows, p=[0.62, 0.21, 0.07, 0.04, 0.04, 0.02]),
+        'booking_changes': rng.choice([0, 1, 2], rows, p=[0.85, 0.11, 0.04]),
+        'deposit_type': rng.choice(['No Deposit', 'Non Refund', 'Refundable'], rows, p=[0.876, 0.122, 0.002]),
+        'agent': rng.choice([9.0, 240.0, 1.0, 14.0, np.nan], rows, p=[0.27, 0.12, 0.06, 0.03, 0.52]),
+        'company': rng.choice([40.0, 223.0, np.nan], rows, p=[0.03, 0.03, 0.94]),
+        'days_in_waiting_list': rng.choice([0, 39, 58], rows, p=[0.97, 0.02, 0.01]),
+        'customer_type': rng.choice(['Transient', 'transient-party', 'Contract', 'GROUP'], rows,
+                                    p=[0.75, 0.21, 0.035, 0.005]),
+        'adr': np.round(rng.gamma(4, 25, rows), 2),
+        'required_car_parking_spaces': rng.choice([0, 1], rows, p=[0.94, 0.06]),
+        'total_of_special_requests': rng.choice([0, 1, 2, 3], rows, p=[0.59, 0.28, 0.11, 0.02]),
+        'reservation_status': rng.choice(['Check-Out', 'Canceled', 'No-Show'], rows, p=[0.63, 0.36, 0.01]),
+        'reservation_status_date': status_text,
+    })
+
+
+class StageTimer:
+    """Mide tiempo y pico de RSS de una etapa
+
+    En Linux el pico de RSS (VmHWM) se reinicia antes de cada etapa
+    escribiendo en /proc/self/clear_refs; en otros sistemas se reporta el
+    pico del proceso (ru_maxrss), que solo crece.
+    """
+    def __init__(self):
+        self.results = []
+
+    @staticmethod
+    def _reset_peak():
+        try:
+            with open('/proc/self/clear_refs', 'w') as file:
+                file.write('5')
+            return True
+        except OSError:
+            return False
+
+    @contextlib.contextmanager
+    def stage(self, rows, name):
+        self._reset_peak()
+        start = time.perf_counter()
+        # Los loaders y savers imprimen mensajes de estado; se silencian aquí
+        with contextlib.redirect_stdout(open(os.devnull, 'w')):
+            yield
+        elapsed = time.perf_counter() - start
+        peak = peak_rss_mb()
+        result = {
+            'rows': rows,
+            'stage': name,
+            'wall_s': round(elapsed, 4),
+            'peak_rss_mb': round(peak, 1) if peak is not None else None,
+            'rows_per_s': round(rows / elapsed, 1) if elapsed > 0 else None
+        }
+        self.results.append(result)
+        print(f"{rows:>10} {name:<32} {elapsed:>9.3f} s {result['peak_rss_mb'] or 0:>9.1f} MB {result['rows_per_s'] or 0:>14,.0f} filas/s")
+
+
+def postgres_config():
+    return {
+        'dbname': os.environ.get('PGDATABASE', 'postgres'),
+        'user': os.environ.get('PGUSER', 'postgres'),
+        'password': os.environ.get('PGPASSWORD', ''),
+        'host': os.environ.get('PGHOST', 'localhost'),
+        'port': os.environ.get('PGPORT', '5432')
+    }
+
+
+def run_size(timer, rows, formats, work_dir, use_postgres):
+    """Ejecuta todas las etapas para un tamaño de datos"""
+    raw = generate_hotel_bookings(rows)
+    formats = [f for f in formats if f != 'excel' or rows <= EXCEL_MAX_ROWS]
+
+    # Archivos de entrada (sin medir)
+    inputs = {}
+    for file_format in formats:
+        path = os.path.join(work_dir, f'hotel_bookings_{rows}.{SAVE_OPTIONS[file_format][1]}')
+        if file_format == 'csv':
+            raw.to_csv(path, index=False)
+        elif file_format == 'excel':
+            raw.to_excel(path, index=False)
+        elif file_format == 'json':
+            raw.to_json(path, orient='records')
+        elif file_format == 'parquet':
+            raw.to_parquet(path, index=False)
+        elif file_format == 'arrow':
+            raw.to_feather(path)
+        inputs[file_format] = path
+
+    loaders = {'csv': CSVDataLoader, 'excel': ExcelDataLoader, 'json': JSONDataLoader,
+               'parquet': ParquetDataLoader, 'arrow': ArrowDataLoader}
+    for file_format, path in inputs.items():
+        with timer.stage(rows, f'load.{file_format}'):
+            loaders[file_format](path).load_data()
+
+    # Pasos de limpieza, en el mismo orden que clean_data
+    cleaner = DataCleaner(raw.copy())
+    for step in CLEANING_STEPS:
+        with timer.stage(rows, f'clean.{step}'):
+            getattr(cleaner, step)()
+    clean = cleaner.data
+
+    for file_format in formats:
+        option, extension = SAVE_OPTIONS[file_format]
+        path = os.path.join(work_dir, f'hotel_bookings_clean_{rows}.{extension}')
+        with timer.stage(rows, f'save.{file_format}'):
+            DataSaver.save_data(clean, option, path)
+
+    if use_postgres:
+        db_config = postgres_config()
+        table_name = 'hotel_bookings_benchmark'
+        with timer.stage(rows, 'save.postgres'):
+            DataSaver._save_postgres_copy(clean, db_config, table_name)
+        for method in ['copy', 'cursor']:
+            with timer.stage(rows, f'load.postgres_{method}'):
+                PostgreSQLDataLoader(table_name=table_name, method=method, **db_config).load_data()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_path):
+    """Imprime la variación de tiempo por etapa frente a un JSON anterior"""
+    with open(previous_path, 'r', encoding='utf-8') as file:
+        previous = json.load(file)
+    before = {(r['rows'], r['stage']): r for r in previous['results']}
+
+    print(f"\nComparación con {previous_path} (commit {previous.get('commit')}):")
+    for result in results:
+        old = before.get((result['rows'], result['stage']))
+        if old and old['wall_s']:
+            ratio = result['wall_s'] / old['wall_s']
+            print(f"{result['rows']:>10} {result['stage']:<32} {old['wall_s']:>9.3f} s -> {result['wall_s']:>9.3f} s ({ratio:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline ETL de reservaciones")
+    parser.add_argument('--rows', default='10000', help="Tamaños separados por comas (p. ej. 10000,1000000,10000000)")
+    parser.add_argument('--formats', default='csv,excel,json,parquet,arrow', help="Formatos de archivo a medir")
+    parser.add_argument('--postgres', action='store_true', help="Medir también PostgreSQL (variables PG*)")
+    parser.add_argument('--output', default='benchmark_results.json', help="Archivo JSON de resultados")
+    parser.add_argument('--compare', help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='hotel_benchmark_')
+    # DataSaver crea el directorio salidan; se redirige al directorio temporal
+    hotel_main2.salidan = work_dir
+    timer = StageTimer()
+
+    try:
+        print(f"{'filas':>10} {'etapa':<32} {'tiempo':>11} {'pico RSS':>12} {'rendimiento':>21}")
+        for rows in [int(n) for n in args.rows.split(',')]:
+            run_size(timer, rows, args.formats.split(','), work_dir, args.postgres)
+
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'results': timer.results
+        }
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+        print(f"\nResultados guardados en {args.output}")
+
+        if args.compare:
+            compare(timer.results, args.compare)
+    except Exception as e:
+        print(f"Error en el benchmark: {e}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,30 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# Permite importar hotel_main2 desde la raíz del proyecto
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from hotel_main2 import DataCleaner, ParallelDataCleaner
+
+# Curva de aceleración de la limpieza en paralelo frente a DataCleaner en serie.
+# Uso: python parallel_speedup.py ruta/hotel_bookings.csv [1,2,4,8]
+if __name__ == "__main__":
+    try:
+        data = pd.read_csv(sys.argv[1])
+        worker_counts = [int(n) for n in sys.argv[2].split(',')] if len(sys.argv) > 2 else [1, 2, 4, 8]
+
+        start = time.perf_counter()
+        reference = DataCleaner(data.copy()).clean_data()
+        serial_time = time.perf_counter() - start
+        print(f"Serie: {serial_time:.2f} s ({len(data)} filas)")
+
+        print("\nProcesos | Tiempo (s) | Aceleración | Idéntico")
+        for workers in worker_counts:
+            start = time.perf_counter()
+            result = ParallelDataCleaner(data.copy(), workers=workers).clean_data()
+            elapsed = time.perf_counter() - start
+            print(f"{workers:8d} | {elapsed:10.2f} | {serial_time / elapsed:10.2f}x | {result.equals(reference)}")
+
+    except Exception as e:
+        print(f"Error en la prueba: {e}")
@@ -0,0 +1,62 @@
+import os
+import sys
+import time
+import asyncio
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# Permite importar hotel_main2 desde la raíz del proyecto
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from hotel_main2 import DataCleaner, DataSaver, PostgreSQLDataLoader, AsyncPostgreSQLLoader, postgres_pool
+
+# Prueba del pool de conexiones y de la lectura concurrente por particiones
+# contra un PostgreSQL local desechable.
+# Uso: python postgres_async.py ruta/hotel_bookings.csv
+# Conexión por variables de entorno PGDATABASE, PGUSER, PGPASSWORD, PGHOST, PGPORT
+db_config = {
+    'dbname': os.environ.get('PGDATABASE', 'postgres'),
+    'user': os.environ.get('PGUSER', 'postgres'),
+    'password': os.environ.get('PGPASSWORD', ''),
+    'host': os.environ.get('PGHOST', 'localhost'),
+    'port': os.environ.get('PGPORT', '5432')
+}
+table_name = 'hotel_bookings_clean_prueba'
+
+try:
+    data = DataCleaner(pd.read_csv(sys.argv[1])).clean_data()
+    DataSaver._save_postgres_copy(data, db_config, table_name)
+    DataSaver._save_postgres_copy(data.head(1000), db_config, table_name + '_muestra')
+
+    # Muchas lecturas simultáneas deben reutilizar como máximo maxconn conexiones
+    with ThreadPoolExecutor(max_workers=postgres_pool.maxconn * 2) as executor:
+        loaders = [PostgreSQLDataLoader(table_name=table_name + '_muestra', **db_config)
+                   for _ in range(postgres_pool.maxconn * 4)]
+        results = list(executor.map(lambda loader: loader.load_data(), loaders))
+    with postgres_pool.connection(db_config) as connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE datname = %s", (db_config['dbname'],))
+            open_connections = cursor.fetchone()[0]
+    print(f"\n{len(results)} lecturas con {open_connections} conexiones abiertas (máximo {postgres_pool.maxconn})")
+
+    print("\nLectura secuencial:")
+    start = time.perf_counter()
+    sequential = PostgreSQLDataLoader(table_name=table_name, **db_config).load_data()
+    print(f"{time.perf_counter() - start:.2f} s")
+
+    print("\nLectura concurrente por meses de reservation_status_date:")
+    ranges = AsyncPostgreSQLLoader.month_ranges(data['reservation_status_date'].min(), data['reservation_status_date'].max())
+    start = time.perf_counter()
+    partitioned = asyncio.run(AsyncPostgreSQLLoader(db_config).load_partitions(table_name, 'reservation_status_date', ranges))
+    print(f"{len(ranges)} particiones en {time.perf_counter() - start:.2f} s")
+
+    missing_dates = int(sequential['reservation_status_date'].isna().sum())
+    if len(partitioned) + missing_dates == len(sequential):
+        print(f"Filas correctas: {len(partitioned)} (+{missing_dates} sin reservation_status_date)")
+    else:
+        print(f"Error: {len(partitioned)} + {missing_dates} != {len(sequential)}")
+
+    tables = asyncio.run(AsyncPostgreSQLLoader(db_config).load_tables([table_name, table_name + '_muestra']))
+    print("\nTablas leídas en paralelo:", {name: frame.shape for name, frame in tables.items()})
+
+except Exception as e:
+    print(f"Error en la prueba: {e}")
@@ -0,0 +1,41 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# Permite importar hotel_main2 desde la raíz del proyecto
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from hotel_main2 import DataCleaner, DataSaver, PostgreSQLDataLoader
+
+# Prueba de carga masiva (COPY) contra un PostgreSQL local desechable.
+# Uso: python postgres_bulk.py ruta/hotel_bookings.csv
+# Conexión por variables de entorno PGDATABASE, PGUSER, PGPASSWORD, PGHOST, PGPORT
+db_config = {
+    'dbname': os.environ.get('PGDATABASE', 'postgres'),
+    'user': os.environ.get('PGUSER', 'postgres'),
+    'password': os.environ.get('PGPASSWORD', ''),
+    'host': os.environ.get('PGHOST', 'localhost'),
+    'port': os.environ.get('PGPORT', '5432')
+}
+table_name = 'hotel_bookings_clean_prueba'
+
+try:
+    data = DataCleaner(pd.read_csv(sys.argv[1])).clean_data()
+
+    print("\nEscritura con COPY FROM STDIN:")
+    DataSaver._save_postgres_copy(data, db_config, table_name)
+
+    for method in ['copy', 'cursor']:
+        print(f"\nLectura con method='{method}':")
+        loader = PostgreSQLDataLoader(table_name=table_name, method=method, **db_config)
+        start = time.perf_counter()
+        loaded = loader.load_data()
+        elapsed = time.perf_counter() - start
+
+        if loaded.shape == data.shape:
+            print(f"Dimensiones correctas {loaded.shape} en {elapsed:.2f} s")
+        else:
+            print(f"Error: Tamaños no coinciden {loaded.shape} != {data.shape}")
+
+except Exception as e:
+    print(f"Error en la prueba: {e}")